@@ -5,9 +5,6 @@
  * See: https://www.gatsbyjs.org/docs/node-apis/
  */
 const jsonld = require("jsonld")
-const n3 = require("n3")
-const { DataFactory } = n3
-const { namedNode } = DataFactory
 const path = require("path")
 const fs = require("fs-extra")
 const { Index, Document } = require("flexsearch")
@@ -23,6 +20,7 @@ const context = require("./src/context")
 const queries = require("./src/queries")
 const types = require("./src/types")
 const { validate } = require("./src/validate.js")
+const { parseTurtle } = require("./src/turtle.js")
 
 require("dotenv").config()
 require("graceful-fs").gracefulify(require("fs"))
@@ -30,35 +28,14 @@ require("graceful-fs").gracefulify(require("fs"))
 const config = loadConfig("./config.yaml", "./config.default.yaml")
 const languages = new Set()
 const languagesByCS = {}
-const inverses = {
-  "http://www.w3.org/2004/02/skos/core#narrower":
-    "http://www.w3.org/2004/02/skos/core#broader",
-  "http://www.w3.org/2004/02/skos/core#broader":
-    "http://www.w3.org/2004/02/skos/core#narrower",
-  "http://www.w3.org/2004/02/skos/core#related":
-    "http://www.w3.org/2004/02/skos/core#related",
-  "http://www.w3.org/2004/02/skos/core#hasTopConcept":
-    "http://www.w3.org/2004/02/skos/core#topConceptOf",
-  "http://www.w3.org/2004/02/skos/core#topConceptOf":
-    "http://www.w3.org/2004/02/skos/core#hasTopConcept",
-}
 
 jsonld.registerRDFParser("text/turtle", (ttlString) => {
-  const quads = new n3.Parser().parse(ttlString)
-  const store = new n3.Store()
-  store.addQuads(quads)
+  const quads = parseTurtle(ttlString)
   quads.forEach((quad) => {
     quad.object.language &&
       languages.add(quad.object.language.replace("-", "_"))
-    inverses[quad.predicate.id] &&
-      store.addQuad(
-        quad.object,
-        namedNode(inverses[quad.predicate.id]),
-        quad.subject,
-        quad.graph
-      )
   })
-  return store.getQuads()
+  return quads
 })
 
 const createData = ({ path, data }) =>
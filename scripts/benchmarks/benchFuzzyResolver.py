@@ -0,0 +1,95 @@
+"""
+Benchmark: FuzzyResolver vs. the linear Levenshtein scan on a synthetic scheme.
+
+Builds a scheme of --concepts German-looking localIDs, mangles a sample of
+them the way the legacy exports do (umlaut → U+FFFD or "ï¿½"), lets every
+broken reference occur several times, and checks that both strategies give
+identical match lists before reporting timings.
+
+    python benchmarks/benchFuzzyResolver.py --concepts 100000 --broken 300
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from fuzzyResolver import FuzzyResolver, linear_resolve  # noqa: E402
+
+SYLLABLES = [
+    "acker", "bau", "ger", "ät", "pflug", "wagen", "achse", "hobel", "fass", "binder",
+    "zug", "geschirr", "ernte", "auf", "züge", "möbel", "schrank", "tisch", "stuhl", "gefäß",
+    "kanne", "krug", "spitze", "klöppel", "stick", "nadel", "werk", "zeug", "teile", "holz",
+]
+
+
+def synthetic_ids(n, rng):
+    seen = set()
+    ids = []
+    while len(ids) < n:
+        words = [
+            "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3))).capitalize()
+            for _ in range(rng.randint(1, 4))
+        ]
+        localID = "_".join(words)
+        if rng.random() < 0.3:
+            localID += f"_({rng.choice(SYLLABLES).capitalize()})"
+        if localID not in seen:
+            seen.add(localID)
+            ids.append(localID)
+    return ids
+
+
+def mangle(localID, rng):
+    for umlaut in "äöüß":
+        if umlaut in localID:
+            return localID.replace(umlaut, rng.choice(["�", "ï¿½"]))
+    i = rng.randrange(len(localID))
+    return localID[:i] + "�" + localID[i + 1:]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concepts", type=int, default=100_000)
+    parser.add_argument("--broken", type=int, default=300, help="distinct broken references")
+    parser.add_argument("--repeat", type=int, default=3, help="occurrences of each broken reference")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    keys = synthetic_ids(args.concepts, rng)
+    broken = [mangle(k, rng) for k in rng.sample(keys, args.broken)]
+    refs = broken * args.repeat
+    rng.shuffle(refs)
+
+    start = time.perf_counter()
+    resolver = FuzzyResolver(keys)
+    buildSeconds = time.perf_counter() - start
+    start = time.perf_counter()
+    indexed = [resolver.resolve(ref) for ref in refs]
+    indexedSeconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    linear = [linear_resolve(ref, keys) for ref in refs]
+    linearSeconds = time.perf_counter() - start
+
+    if indexed != linear:
+        mismatches = sum(1 for a, b in zip(indexed, linear) if a != b)
+        print(f"MISMATCH: {mismatches} of {len(refs)} references differ")
+        return 1
+
+    ambiguous = sum(1 for m in indexed if len(m) > 1)
+    print(f"{len(keys)} concepts, {len(refs)} broken references ({len(broken)} distinct, {ambiguous} ambiguous)")
+    print(f"  linear scan:   {linearSeconds:8.3f} s  ({len(refs) * len(keys)} comparisons)")
+    print(
+        f"  FuzzyResolver: {indexedSeconds:8.3f} s  ({resolver.comparisons} comparisons, "
+        f"{resolver.cacheHits} cache hits, index built in {buildSeconds:.3f} s)"
+    )
+    print(f"  speed-up:      {linearSeconds / max(indexedSeconds + buildSeconds, 1e-9):8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+"""
+Benchmark: ID minting and every converter stage on synthetic schemes.
+
+For each --sizes entry a synthetic legacy RDF/XML source is generated (see
+syntheticScheme.py) and converted once per --modes entry in a fresh worker
+process, so peak RSS figures do not carry over between runs. The conversion
+runs with validation, diff, hierarchy and label indexes switched on, and its
+per-stage wall/CPU time and peak RSS come from the converter's own metrics
+(pipelineMetrics; where the RSS high-water mark cannot be reset per stage,
+the growth of the process peak is shown instead, marked "+"). IdMinter is timed separately for the same number of IDs.
+
+Every run is appended as one JSON line to benchmarks/benchResults.jsonl,
+tagged with the current commit, so two commits can be compared:
+
+    python benchmarks/benchPipeline.py --sizes 1000 10000 100000
+    python benchmarks/benchPipeline.py --sizes 10000 --compare 870057d   # ratios against that commit
+"""
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from syntheticScheme import SCHEME, generate  # noqa: E402
+
+RESULTS_FILE = os.path.join(BENCH_DIR, "benchResults.jsonl")
+
+
+def git_revision():
+    """(commit hash, True if the work tree has uncommitted changes), or (None, None) outside git."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=SCRIPTS_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=SCRIPTS_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, bool(status.strip())
+
+
+# ---------------------------------------------------------------------------
+# One run (in its own worker process)
+# ---------------------------------------------------------------------------
+def time_minting(n, seed=1):
+    from generateID import IdMinter
+
+    start = time.perf_counter()
+    ids = IdMinter(seed).mint(n)
+    mintSeconds = time.perf_counter() - start
+    start = time.perf_counter()
+    IdMinter(seed + 1).mint(n, exclude=ids)
+    excludeSeconds = time.perf_counter() - start
+    return {"mint": round(mintSeconds, 4), "mintExcluding": round(excludeSeconds, 4)}
+
+
+def run_conversion(source, workDir, streaming, writer):
+    import vocabularyCheckupModified as converter
+
+    converter.OUTPUT_DIR = os.path.join(workDir, "ttl")
+    converter.descriptionDict[SCHEME] = {
+        "title": "Synthetische Systematik",
+        "description": "Synthetisches Vokabular für Benchmarks",
+        "author": "Benchmark",
+    }
+    os.makedirs(converter.OUTPUT_DIR, exist_ok=True)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        summary = converter.convert_scheme(
+            source,
+            streaming=streaming,
+            ledger=os.path.join(workDir, "idLedger.jsonl"),
+            manifest=os.path.join(workDir, "buildManifest.json"),
+            force=True,
+            writer=writer,
+            validate=True,
+            hierarchyIndex=True,
+            labelIndex=True,
+            diff=True,
+        )
+    return {
+        "seconds": round(summary["seconds"], 4),
+        "violations": summary["validation"]["violations"],
+        **summary["metrics"],
+    }
+
+
+def benchmark_run(size, mode, writer, seed):
+    """Generate, convert and time one synthetic scheme. Runs in a fresh process."""
+    os.chdir(SCRIPTS_DIR)  # the converter resolves its UUID pools and shapes relative to scripts/
+    with tempfile.TemporaryDirectory() as workDir:
+        source = os.path.join(workDir, f"{SCHEME}.rdf")
+        start = time.perf_counter()
+        with open(source, "w", encoding="utf-8") as f:
+            generate(f, size, seed)
+        generateSeconds = time.perf_counter() - start
+        result = {
+            "size": size,
+            "mode": mode,
+            "writer": writer,
+            "seed": seed,
+            "sourceMiB": round(os.path.getsize(source) / 2**20, 2),
+            "generateSeconds": round(generateSeconds, 4),
+            "generateID": time_minting(size, seed),
+        }
+        result.update(run_conversion(source, workDir, mode == "streaming", writer))
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Results
+# ---------------------------------------------------------------------------
+def load_results(path, commit):
+    """Latest stored result per (size, mode, writer) for commits starting with `commit`."""
+    latest = {}
+    if not os.path.exists(path):
+        return latest
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            if (record.get("commit") or "").startswith(commit):
+                latest[(record["size"], record["mode"], record["writer"])] = record
+    return latest
+
+
+def stage_seconds(result):
+    seconds = {f"generateID.{name}": value for name, value in result["generateID"].items()}
+    seconds.update({name: stage["wallSeconds"] for name, stage in result["stages"].items()})
+    seconds["total"] = result["seconds"]
+    return seconds
+
+
+def print_result(result, baseline=None):
+    print(
+        f"{result['size']} concepts, {result['mode']}, {result['writer']} writer "
+        f"({result['sourceMiB']} MiB source, {result['counters'].get('triples', 0)} triples)"
+    )
+    current = stage_seconds(result)
+    previous = stage_seconds(baseline) if baseline else {}
+    for name, seconds in current.items():
+        stage = result["stages"].get(name, {})
+        line = f"  {name:26s} {seconds:9.3f} s"
+        if "peakRssMiB" in stage:
+            line += f"  {stage['peakRssMiB']:8.1f} MiB"
+        elif "maxRssGrowthMiB" in stage:
+            line += f"  +{stage['maxRssGrowthMiB']:7.1f} MiB"
+        else:
+            line += " " * 14
+        if name in previous and previous[name] > 0:
+            line += f"  {seconds / previous[name]:6.2f}x vs {baseline['commit'][:10]}"
+        print(line)
+    if result["violations"]:
+        print(f"  WARNING: {result['violations']} SHACL violations, later stages did not run")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10_000], help="concepts per synthetic scheme")
+    parser.add_argument("--modes", nargs="+", choices=("dom", "streaming"), default=["dom", "streaming"])
+    parser.add_argument("--writer", choices=("rdflib", "stream"), default="rdflib")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--results", default=RESULTS_FILE, help=f"JSONL result history (default: {RESULTS_FILE})")
+    parser.add_argument("--compare", metavar="COMMIT", help="show ratios against stored results of this commit")
+    parser.add_argument("--no-save", dest="save", action="store_false", help="do not append to the result history")
+    args = parser.parse_args(argv)
+
+    commit, dirty = git_revision()
+    baselines = load_results(args.results, args.compare) if args.compare else {}
+    if args.compare and not baselines:
+        print(f"No stored results for commit {args.compare} in {args.results}", file=sys.stderr)
+
+    for size in args.sizes:
+        for mode in args.modes:
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                result = pool.submit(benchmark_run, size, mode, args.writer, args.seed).result()
+            result = {
+                "commit": commit,
+                "dirty": dirty,
+                "date": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                **result,
+            }
+            print_result(result, baselines.get((size, mode, args.writer)))
+            if args.save:
+                with open(args.results, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(result, ensure_ascii=False) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+Benchmark: rdfWriter's streaming Turtle/N-Triples writers vs. rdflib's serializer.
+
+Loads each converted scheme once (from its graph snapshot), then writes it
+with rdflib's Turtle serializer and with both streaming writers, reporting
+wall time and the peak memory allocated while writing. The streamed Turtle
+is checked to contain exactly the same subject blocks as rdflib's output.
+
+    python benchmarks/benchRdfWriter.py ttl/grobsystematik_modified.ttl
+"""
+import argparse
+import glob
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from graphSnapshot import load_graph  # noqa: E402
+from rdfWriter import write_ntriples, write_turtle  # noqa: E402
+
+
+def rdflib_turtle(graph, out):
+    out.write(graph.serialize(format="turtle", encoding="utf-8"))
+
+
+WRITERS = [
+    ("rdflib turtle", rdflib_turtle),
+    ("stream turtle", write_turtle),
+    ("stream nt", write_ntriples),
+]
+
+
+def blocks(data):
+    parts = data.decode("utf-8").split("\n\n")
+    return parts[0], sorted(part.strip() for part in parts[1:] if part.strip())
+
+
+def run(writer, graph, path):
+    with open(path, "wb") as out:
+        start = time.perf_counter()
+        writer(graph, out)
+        return time.perf_counter() - start
+
+
+def peak_memory(writer, graph, path):
+    with open(path, "wb") as out:
+        tracemalloc.start()
+        writer(graph, out)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("outputs", nargs="*", help="converted Turtle files (default: ttl/*_modified.ttl)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per writer, best time is reported")
+    args = parser.parse_args(argv)
+
+    status = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        for ttlPath in args.outputs or sorted(glob.glob("ttl/*_modified.ttl")):
+            graph = load_graph(ttlPath)
+
+            reference, streamed = io.BytesIO(), io.BytesIO()
+            rdflib_turtle(graph, reference)
+            write_turtle(graph, streamed)
+            same = blocks(reference.getvalue()) == blocks(streamed.getvalue())
+            if not same:
+                status = 1
+
+            print(f"{ttlPath}: {len(graph)} triples{'' if same else '  MISMATCH: subject blocks differ'}")
+            baseline = None
+            for name, writer in WRITERS:
+                path = os.path.join(tmp, "out")
+                seconds = min(run(writer, graph, path) for _ in range(args.repeat))
+                peak = peak_memory(writer, graph, path)
+                baseline = baseline or seconds
+                print(
+                    f"  {name:14s} {seconds:8.3f} s  {baseline / seconds:5.1f}x  "
+                    f"peak {peak / 2**20:7.1f} MiB  {os.path.getsize(path) / 2**20:6.1f} MiB written"
+                )
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""
+Synthetic legacy museumvok RDF/XML of any size, for benchmarking the converter.
+
+The output reproduces the quirks of the real exports that the converter has
+to deal with:
+
+  - xml:base http://www.museumsvokabular.de/museumvok/ and rdf:about values
+    that are relative "scheme/local ID" fragments containing spaces
+  - concept references carrying the wrong scheme prefix ("gefaess/...")
+  - references with umlauts mangled into U+FFFD or "ï¿½"
+  - repeated skos:definition and skos:example elements (examples as
+    rdf:parseType="Literal"), packed altLabels and XML editorial notes
+  - dc:identifier, dc:creator and dcq:created on every concept
+  - the cc:Work / cc:License block at the top of the document
+
+Concepts form a forest (about 1 % top concepts) with narrower on the parent
+and broader on the child, plus occasional skos:related links. The document
+is written concept by concept, so generating a million concepts needs
+memory only for their IDs and parents.
+
+    python benchmarks/syntheticScheme.py --concepts 100000 --out /tmp/synthetic.rdf
+"""
+import argparse
+import os
+import random
+import sys
+from xml.sax.saxutils import escape, quoteattr
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from benchFuzzyResolver import SYLLABLES, mangle, synthetic_ids  # noqa: E402
+
+SCHEME = "synthetic"
+LEGACY_BASE = "http://www.museumsvokabular.de/museumvok/"
+WRONG_SCHEME = "gefaess"
+CREATORS = ["Institut für Museumskunde", "Spengler, W. Eckehart", "Sächsische Landesstelle für Museumswesen"]
+
+HEADER = f"""<?xml version="1.0" encoding="UTF-8"?>
+<rdf:RDF xml:base="{LEGACY_BASE}"
+         xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+         xmlns:rdfs="http://www.w3.org/2000/01/rdf-schema#"
+         xmlns:skos="http://www.w3.org/2004/02/skos/core#"
+         xmlns:dc="http://purl.org/dc/elements/1.1/"
+         xmlns:dcq="http://purl.org/dc/qualifier/1.0/"
+         xmlns:foaf="http://xmlns.com/foaf/0.1/"
+         xmlns:cc="http://web.resource.org/cc/">
+
+<!--Creative Commons License-->
+  <cc:Work rdf:about="">
+    <cc:license rdf:resource="http://creativecommons.org/licenses/by-nc-sa/2.0/de/" />
+  <dc:type rdf:resource="http://purl.org/dc/dcmitype/Text" />
+  </cc:Work>
+  <cc:License rdf:about="http://creativecommons.org/licenses/by-nc-sa/2.0/de/">
+  <cc:permits rdf:resource="http://web.resource.org/cc/Reproduction"/>
+  <cc:permits rdf:resource="http://web.resource.org/cc/Distribution"/>
+  <cc:requires rdf:resource="http://web.resource.org/cc/Notice"/>
+  <cc:requires rdf:resource="http://web.resource.org/cc/Attribution"/>
+  <cc:prohibits rdf:resource="http://web.resource.org/cc/CommercialUse"/>
+  <cc:permits rdf:resource="http://web.resource.org/cc/DerivativeWorks"/>
+  <cc:requires rdf:resource="http://web.resource.org/cc/ShareAlike"/>
+  </cc:License>
+ <!--Creative Commons License-->
+
+"""
+
+
+def sentence(rng, words=8):
+    return " ".join(rng.choice(SYLLABLES) + rng.choice(SYLLABLES) for _ in range(words)).capitalize() + "."
+
+
+def generate(out, concepts, seed=1, mangled=0.02, related=0.05, definitions=0.3, scheme=SCHEME):
+    """Write a synthetic legacy RDF/XML document with `concepts` concepts to the text stream `out`."""
+    rng = random.Random(seed)
+    ids = synthetic_ids(concepts, rng)
+    parents = [None] * concepts
+    children = [[] for _ in range(concepts)]
+    for i in range(1, concepts):
+        if rng.random() >= 0.01:
+            # Parents among the most recent concepts keep the trees deep and narrow
+            parents[i] = rng.randrange(max(0, i - 50), i)
+            children[parents[i]].append(i)
+
+    def ref(i):
+        localID = ids[i]
+        if rng.random() < mangled and any(c in localID for c in "äöüß"):
+            localID = mangle(localID, rng)
+        prefix = WRONG_SCHEME if rng.random() < 0.9 else scheme
+        return quoteattr(f"{prefix}/{localID.replace('_', ' ')}")
+
+    out.write(HEADER)
+    for i, localID in enumerate(ids):
+        label = localID.replace("_", " ")
+        parts = [
+            f"<skos:Concept rdf:about={quoteattr(f'{scheme}/{label}')}>",
+            f'<skos:prefLabel xml:lang="de">{escape(label)}</skos:prefLabel>',
+        ]
+        if rng.random() < 0.5:
+            altLabels = ", ".join(f"{rng.choice(SYLLABLES).capitalize()} ({label.split()[0]}-)" for _ in range(rng.randint(1, 3)))
+            parts.append(f'<skos:altLabel xml:lang="de">{escape(altLabels)}</skos:altLabel>')
+        parts.append(f"<skos:inScheme>{scheme}</skos:inScheme>")
+        if parents[i] is not None:
+            parts.append(f"<skos:broader rdf:resource={ref(parents[i])} />")
+        parts.extend(f"<skos:narrower rdf:resource={ref(c)} />" for c in children[i])
+        if i and rng.random() < related:
+            parts.append(f"<skos:related rdf:resource={ref(rng.randrange(concepts))} />")
+        if rng.random() < definitions:
+            parts.extend(f"<skos:definition>{escape(sentence(rng))}</skos:definition>" for _ in range(rng.randint(1, 4)))
+        if rng.random() < 0.05:
+            parts.extend(
+                f'<skos:example rdf:parseType="Literal">{escape(sentence(rng, 3))}</skos:example>'
+                for _ in range(rng.randint(1, 3))
+            )
+        if rng.random() < 0.1:
+            parts.append(f'<skos:editorialNote rdf:parseType="Literal">S {rng.randint(1, 99)}/{rng.randint(1, 99)}, T {rng.randint(1, 60)} &amp; H {rng.randint(1, 200)}</skos:editorialNote>')
+        parts += [
+            f"<dc:identifier>{escape(localID)}</dc:identifier>",
+            f"<dc:creator>{escape(rng.choice(CREATORS))}</dc:creator>",
+            f"<dcq:created>{rng.randint(1985, 2005)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}</dcq:created>",
+            "</skos:Concept>\n",
+        ]
+        out.write("".join(parts))
+    out.write("</rdf:RDF>\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concepts", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--mangled", type=float, default=0.02, help="share of umlaut references that are mangled")
+    parser.add_argument("--out", default="-", help="output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    out = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8")
+    try:
+        generate(out, args.concepts, args.seed, args.mangled)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""
+Build manifest for incremental re-conversion.
+
+For every source the manifest records a hash of the RDF/XML file, a hash of
+the configuration that shapes its output (scheme metadata, output options),
+the converter version and a hash of the Turtle that was written. A source
+whose three input hashes match, and whose output is still on disk unchanged,
+does not need to be converted again.
+
+Outputs are written atomically (temporary file + rename) and only when their
+bytes differ from what is already there, so unchanged schemes keep their
+mtime and do not trigger downstream rebuilds.
+"""
+import hashlib
+import json
+import os
+import tempfile
+
+MANIFEST_FILE = "buildManifest.json"
+
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def config_digest(config):
+    """Hash of a JSON-serialisable configuration (key order does not matter)."""
+    data = json.dumps(config, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def write_atomic(path, data):
+    """Write bytes to `path` via a temporary file in the same directory and a rename."""
+    directory = os.path.dirname(path) or "."
+    fd, tmpPath = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(path))
+    try:
+        # mkstemp creates the file as 0600; give it the mode a plain open() would
+        os.chmod(tmpPath, 0o666 & ~_UMASK)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmpPath, path)
+    except BaseException:
+        os.unlink(tmpPath)
+        raise
+
+
+def write_if_changed(path, data):
+    """Atomically replace `path` with `data` unless it already holds exactly these bytes. Returns True if written."""
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+    write_atomic(path, data)
+    return True
+
+
+class AtomicOutput:
+    """
+    Binary file object for streaming an output to `path`.
+
+    Data goes to a temporary file in the same directory while it is hashed.
+    On a clean exit the temporary file replaces `path`, unless `path` already
+    holds exactly these bytes; after the `with` block `written` and
+    `hexdigest` describe the result. On an exception `path` is left alone.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.written = False
+        self.hexdigest = None
+        self._hash = hashlib.sha256()
+        self._size = 0
+        fd, self._tmpPath = tempfile.mkstemp(
+            dir=os.path.dirname(path) or ".", prefix=".tmp-", suffix=os.path.basename(path)
+        )
+        os.chmod(self._tmpPath, 0o666 & ~_UMASK)
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, data):
+        self._file.write(data)
+        self._hash.update(data)
+        self._size += len(data)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, exc, tb):
+        try:
+            if excType is not None:
+                return
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self.hexdigest = self._hash.hexdigest()
+            if (
+                os.path.exists(self.path)
+                and os.path.getsize(self.path) == self._size
+                and file_digest(self.path) == self.hexdigest
+            ):
+                return
+            os.replace(self._tmpPath, self.path)
+            self.written = True
+        finally:
+            self._file.close()
+            if not self.written and os.path.exists(self._tmpPath):
+                os.unlink(self._tmpPath)
+
+
+class BuildManifest:
+    def __init__(self, path=MANIFEST_FILE):
+        self.path = path
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except FileNotFoundError:
+            self.entries = {}
+
+    def is_current(self, source, sourceHash, configHash, version):
+        """
+        The manifest entry for `source` if it was built from exactly these
+        inputs and its output is still intact, else None.
+        """
+        entry = self.entries.get(source)
+        if (
+            entry is None
+            or entry.get("sourceHash") != sourceHash
+            or entry.get("configHash") != configHash
+            or entry.get("converterVersion") != version
+        ):
+            return None
+        output = entry.get("output")
+        if not output or not os.path.exists(output) or file_digest(output) != entry.get("outputHash"):
+            return None
+        return entry
+
+    def record(self, source, entry):
+        self.entries[source] = entry
+
+    def save(self):
+        data = json.dumps(self.entries, indent=4, sort_keys=True, ensure_ascii=False) + "\n"
+        write_if_changed(self.path, data.encode("utf-8"))
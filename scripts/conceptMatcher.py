@@ -0,0 +1,282 @@
+"""
+Batch matching of free-text object terms to concepts of the converted schemes.
+
+For every input term and scheme, candidates are tried in three stages and
+the first stage that finds anything wins:
+
+    exact        a label equals the term verbatim                 score 1.0
+    normalized   normalize_label(label) == normalize_label(term)  score 0.9
+    fuzzy        normalised labels at the smallest Levenshtein
+                 distance, if within --max-distance of the term   score 0.8 · (1 − d / len)
+
+Labels come from the label index shards the converter writes with
+--label-index (built from the graph snapshot when a shard is missing or its
+ttlHash is not the SHA-256 of the Turtle file on disk). Fuzzy search reuses
+FuzzyResolver, so each scheme's keys are bucketed by length once per process;
+the largest distance --max-distance allows for a term bounds the search from
+the start, so a term with nothing close costs a few length buckets rather
+than a scan of every key. Repeated terms hit a bounded LRU cache.
+
+    python conceptMatcher.py terms.jsonl > matches.jsonl
+    python conceptMatcher.py objects.csv --field Objektbezeichnung --id-field Inventarnummer -j 4
+
+Input is JSONL (objects with a "term" field, or bare JSON strings) or CSV
+(with a header row); output is one JSON object per input record:
+
+    {"id": ..., "term": "Streichmass",
+     "matches": {"ackerbau": [{"uri": ..., "label": "Streichmaß", "method": "normalized", "score": 0.9}]}}
+
+A record that cannot be read (invalid JSON, no string term field) does not
+stop the batch; its output line carries an "error" instead of matches:
+
+    {"id": 17, "term": null, "error": "line 17: no string 'term' field", "matches": {}}
+"""
+import argparse
+import csv
+import glob
+import io
+import json
+import math
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from Levenshtein import distance
+from rdflib import URIRef
+from rdflib.namespace import RDF, SKOS
+
+from fuzzyResolver import FuzzyResolver
+from graphSnapshot import load_graph
+from labelIndex import LabelIndex, build_label_index, load_current_label_index, normalize_label, split_packed
+
+SCORES = {"exact": 1.0, "normalized": 0.9, "fuzzy": 0.8}
+MAX_DISTANCE = 0.25  # fuzzy matches may differ in at most this share of characters
+CHUNK_SIZE = 500
+CACHE_SIZE = 10_000  # fuzzy results kept per scheme and worker
+
+
+# ---------------------------------------------------------------------------
+# Per-scheme matcher
+# ---------------------------------------------------------------------------
+def load_label_index(ttlPath, lang):
+    """LabelIndex for one converted scheme, from its shard or rebuilt from the graph."""
+    index = load_current_label_index(ttlPath, lang)
+    if index is not None:
+        return index
+    g = load_graph(ttlPath)
+    schemeURI = g.value(None, RDF.type, SKOS.ConceptScheme)
+    shards = build_label_index(g, URIRef(schemeURI))
+    return LabelIndex(shards[lang]) if lang in shards else None
+
+
+class SchemeMatcher:
+    def __init__(self, index, maxDistance=MAX_DISTANCE):
+        self.index = index
+        self.maxDistance = maxDistance
+        self.exact = {}
+        for i, (_, kind, label) in enumerate(index.labels):
+            for part in [label] + (split_packed(label) if kind != "pref" and "," in label else []):
+                self.exact.setdefault(part, []).append(i)
+        self.resolver = FuzzyResolver(sorted(index.normalized), cacheSize=CACHE_SIZE)
+
+    def _candidates(self, labelNumbers, method, score):
+        labels = self.index.labels
+        ranked = sorted(labelNumbers, key=lambda i: (labels[i][1] != "pref", labels[i][0]))
+        seen = set()
+        matches = []
+        for i in ranked:
+            conceptID, _, label = labels[i]
+            if conceptID not in seen:
+                seen.add(conceptID)
+                matches.append({
+                    "uri": self.index.uri(conceptID),
+                    "label": label,
+                    "method": method,
+                    "score": round(score, 3),
+                })
+        return matches
+
+    def match(self, term):
+        """Ranked candidate concepts for `term` (empty list if nothing is close enough)."""
+        if term in self.exact:
+            return self._candidates(self.exact[term], "exact", SCORES["exact"])
+        key = normalize_label(term)
+        if not key:
+            return []
+        if key in self.index.normalized:
+            return self._candidates(self.index.normalized[key], "normalized", SCORES["normalized"])
+        # A distance d is accepted if d <= maxDistance · len, i.e. d <= floor of that
+        nearest = self.resolver.resolve(key, math.floor(self.maxDistance * len(key)))
+        if not nearest:
+            return []
+        d = distance(key, nearest[0])
+        numbers = [i for k in nearest for i in self.index.normalized[k]]
+        return self._candidates(numbers, "fuzzy", SCORES["fuzzy"] * (1 - d / max(len(key), 1)))
+
+
+class ConceptMatcher:
+    """Matchers for a set of converted schemes, keyed by scheme name."""
+
+    def __init__(self, ttlPaths, lang="de", maxDistance=MAX_DISTANCE):
+        self.schemes = {}
+        for ttlPath in ttlPaths:
+            index = load_label_index(ttlPath, lang)
+            if index is not None:
+                scheme = os.path.basename(ttlPath).split("_modified")[0]
+                self.schemes[scheme] = SchemeMatcher(index, maxDistance)
+
+    def match(self, term, limit=5):
+        result = {}
+        for scheme, matcher in self.schemes.items():
+            matches = matcher.match(term)
+            if matches:
+                result[scheme] = matches[:limit]
+        return result
+
+
+# ---------------------------------------------------------------------------
+# Batch processing
+# ---------------------------------------------------------------------------
+def read_records(f, format, field="term", idField="id"):
+    """
+    (id, term, error) triples from a JSONL or CSV stream. A record without a
+    usable term gets term None and an error message; a CSV header without
+    the `field` column raises ValueError.
+    """
+    if format == "csv":
+        reader = csv.DictReader(f)
+        if reader.fieldnames is not None and field not in reader.fieldnames:
+            raise ValueError(f"CSV header has no {field!r} column")
+        return _csv_records(reader, field, idField)
+    return _jsonl_records(f, field, idField)
+
+
+def _csv_records(reader, field, idField):
+    for n, row in enumerate(reader, 1):
+        term = row.get(field)
+        if term is None:
+            yield row.get(idField, n), None, f"row {n}: no {field!r} value"
+        else:
+            yield row.get(idField, n), term, None
+
+
+def _jsonl_records(f, field, idField):
+    for n, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield n, None, f"line {n}: invalid JSON ({e.msg})"
+            continue
+        if isinstance(record, str):
+            yield n, record, None
+        elif not isinstance(record, dict):
+            yield n, None, f"line {n}: expected an object or a string"
+        elif not isinstance(record.get(field), str):
+            yield record.get(idField, n), None, f"line {n}: no string {field!r} field"
+        else:
+            yield record.get(idField, n), record[field], None
+
+
+_matcher = None
+
+
+def _init_worker(ttlPaths, lang, maxDistance):
+    global _matcher
+    _matcher = ConceptMatcher(ttlPaths, lang, maxDistance)
+
+
+def _match_chunk(chunk, limit):
+    return [
+        json.dumps(
+            {"id": recordID, "term": term, "matches": _matcher.match(term, limit)} if error is None
+            else {"id": recordID, "term": term, "error": error, "matches": {}},
+            ensure_ascii=False,
+        )
+        for recordID, term, error in chunk
+    ]
+
+
+def chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def write_lines(f, lines):
+    f.write("".join(line + "\n" for line in lines))
+    return len(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Match free-text terms to concepts of the converted schemes.")
+    parser.add_argument("input", nargs="?", default="-", help="JSONL or CSV file (default: stdin, JSONL)")
+    parser.add_argument("-o", "--out", default="-", help="JSONL output (default: stdout)")
+    parser.add_argument("--format", choices=("jsonl", "csv"), help="input format (default: from the file extension)")
+    parser.add_argument("--field", default="term", help="record field holding the term (default: term)")
+    parser.add_argument("--id-field", default="id", help="record field copied to the output as id (default: id)")
+    parser.add_argument("--schemes", nargs="*", help="converted Turtle files (default: ttl/*_modified.ttl)")
+    parser.add_argument("--lang", default="de", help="label language (default: de)")
+    parser.add_argument("--limit", type=int, default=5, help="candidates per scheme (default: 5)")
+    parser.add_argument(
+        "--max-distance", type=float, default=MAX_DISTANCE,
+        help=f"largest fuzzy edit distance as a share of the term length (default: {MAX_DISTANCE})",
+    )
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="worker processes (0 = one per CPU)")
+    args = parser.parse_args(argv)
+
+    ttlPaths = args.schemes or sorted(glob.glob("ttl/*_modified.ttl"))
+    format = args.format or ("csv" if args.input.endswith(".csv") else "jsonl")
+    jobs = args.jobs or os.cpu_count() or 1
+
+    inFile = (
+        io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline="")
+        if args.input == "-" else open(args.input, "r", encoding="utf-8", newline="")
+    )
+    outFile = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8")
+    start = time.perf_counter()
+    count = malformed = 0
+    try:
+        try:
+            records = chunks(read_records(inFile, format, args.field, args.id_field), CHUNK_SIZE)
+        except ValueError as e:
+            print(f"{args.input}: {e}", file=sys.stderr)
+            return 2
+        if jobs > 1:
+            with ProcessPoolExecutor(jobs, initializer=_init_worker,
+                                     initargs=(ttlPaths, args.lang, args.max_distance)) as pool:
+                # A bounded window of chunks in flight keeps memory flat on
+                # large inputs; results are written in input order
+                pending = deque()
+                for chunk in records:
+                    malformed += sum(error is not None for _, _, error in chunk)
+                    pending.append(pool.submit(_match_chunk, chunk, args.limit))
+                    if len(pending) >= 4 * jobs:
+                        count += write_lines(outFile, pending.popleft().result())
+                while pending:
+                    count += write_lines(outFile, pending.popleft().result())
+        else:
+            _init_worker(ttlPaths, args.lang, args.max_distance)
+            for chunk in records:
+                malformed += sum(error is not None for _, _, error in chunk)
+                count += write_lines(outFile, _match_chunk(chunk, args.limit))
+    finally:
+        if inFile is not sys.stdin:
+            inFile.close()
+        if outFile is not sys.stdout:
+            outFile.close()
+    print(
+        f"Matched {count - malformed} terms in {time.perf_counter() - start:.2f} s"
+        + (f" ({malformed} unreadable records, see their \"error\")" if malformed else ""),
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
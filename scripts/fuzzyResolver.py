@@ -0,0 +1,103 @@
+"""
+Fuzzy resolution of broken concept references.
+
+The legacy museumvok exports contain references whose umlauts were mangled
+into U+FFFD ("Wetzger�t") or into the UTF-8-as-Latin-1 sequence "ï¿½". Those
+are resolved to the known concept ID with the smallest Levenshtein distance.
+
+A plain scan compares every broken reference against every concept ID. The
+resolver below buckets the IDs by length once per scheme: since the length
+difference of two strings is a lower bound on their edit distance, buckets
+are visited in order of increasing length difference and the search stops as
+soon as no remaining bucket can beat (or tie) the best distance found so far.
+A caller that only wants matches within some distance passes it as
+`maxDistance`; it acts as the bound from the first comparison, so buckets
+and keys beyond it are skipped instead of searched for a minimum that is
+then thrown away. Results are cached, because the same broken reference
+usually appears on several concepts (every child of a mangled parent
+carries it); `cacheSize` bounds the cache (least recently used first out)
+for long-running lookups over unbounded input.
+"""
+from collections import OrderedDict, defaultdict
+
+from Levenshtein import distance
+
+MOJIBAKE_MARKERS = ("�", "ï¿½")
+
+
+def is_mangled(ref):
+    """True if the reference contains a replacement character or its mojibake."""
+    return any(marker in ref for marker in MOJIBAKE_MARKERS)
+
+
+class FuzzyResolver:
+    """
+    Minimum-edit-distance lookup over a fixed list of keys.
+
+    `resolve` returns exactly what a linear scan over `keys` would: every key
+    at the minimum distance, in the order the keys were given.
+    """
+
+    def __init__(self, keys, cacheSize=None):
+        self.keys = list(keys)
+        self._buckets = defaultdict(list)  # length → [(position in keys, key)]
+        for i, key in enumerate(self.keys):
+            self._buckets[len(key)].append((i, key))
+        self._lengths = sorted(self._buckets)
+        self.cacheSize = cacheSize  # None: unbounded, 0: no cache
+        self._cache = OrderedDict()
+        self.lookups = 0
+        self.cacheHits = 0
+        self.comparisons = 0
+
+    def __len__(self):
+        return len(self.keys)
+
+    def resolve(self, ref, maxDistance=None):
+        """
+        Return a tuple of all keys at minimum distance from `ref` (empty if
+        there are no keys, or if that distance is above `maxDistance`).
+        """
+        self.lookups += 1
+        cacheKey = (ref, maxDistance)
+        matches = self._cache.get(cacheKey)
+        if matches is not None:
+            self.cacheHits += 1
+            self._cache.move_to_end(cacheKey)
+            return matches
+        matches = self._search(ref, maxDistance)
+        if self.cacheSize != 0:
+            self._cache[cacheKey] = matches
+            if self.cacheSize is not None and len(self._cache) > self.cacheSize:
+                self._cache.popitem(last=False)
+        return matches
+
+    def _search(self, ref, maxDistance=None):
+        n = len(ref)
+        best = maxDistance  # bound on the distances still of interest
+        found = []
+        for length in sorted(self._lengths, key=lambda length: abs(length - n)):
+            if best is not None and abs(length - n) > best:
+                break
+            for i, key in self._buckets[length]:
+                self.comparisons += 1
+                # With a cutoff, anything worse than `best` comes back as best + 1
+                d = distance(ref, key, score_cutoff=best)
+                if best is not None and d > best:
+                    continue
+                if not found or d < best:
+                    best = d
+                    found = [(i, key)]
+                else:
+                    found.append((i, key))
+        found.sort()
+        return tuple(key for _, key in found)
+
+
+def linear_resolve(ref, keys):
+    """Reference implementation: the full scan the converters used to do."""
+    if not keys:
+        return ()
+    distances = [distance(ref, k) for k in keys]
+    minDist = min(distances)
+    return tuple(keys[i] for i, d in enumerate(distances) if d == minDist)
@@ -0,0 +1,213 @@
+"""
+Semantic changeset between two versions of a converted scheme.
+
+Reviewing an import by diffing 12k-line Turtle files is impractical, and a
+textual diff says nothing about which concepts actually changed. Instead,
+every subject block (all triples of one subject) of both graphs is hashed
+over its sorted N-Triples form; only subjects whose hash differs are
+compared triple by triple, so a run stays linear in the size of the graphs.
+
+The converter writes two files next to ttl/<scheme>_modified.ttl with
+--diff, whenever the new graph differs from the previous output:
+
+    ttl/<scheme>_changes.json   concepts added / removed / changed, with the
+                                added and removed objects per predicate
+    ttl/<scheme>_changes.rdfp   RDF Patch (https://afs.github.io/rdf-patch/):
+                                one transaction of D (delete) and A (add) rows
+
+The patch header carries the SHA-256 of the output it applies to (`prev`)
+and of the output it produces (`id`) as urn:sha256: URIs, so patches chain
+and downstream caches can tell whether a patch fits the file they hold.
+
+    python graphDiff.py old/ackerbau_modified.ttl ttl/ackerbau_modified.ttl --patch ackerbau.rdfp
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+
+from rdflib.namespace import RDF, SKOS
+
+from buildManifest import write_if_changed
+from graphSnapshot import load_view
+from rdfWriter import ntriples_term
+
+CHANGES_SUFFIX = "_changes"
+
+
+def changes_path(outPath, extension):
+    """Changeset next to ttl/<scheme>_modified.ttl: ttl/<scheme>_changes<extension>."""
+    directory, name = os.path.split(outPath)
+    return os.path.join(directory, name.split("_modified")[0] + CHANGES_SUFFIX + extension)
+
+
+def version_uri(outputHash):
+    return f"urn:sha256:{outputHash}" if outputHash else None
+
+
+# ---------------------------------------------------------------------------
+# Diffing
+# ---------------------------------------------------------------------------
+def block_hashes(graph):
+    """{subject: digest of its sorted predicate/object lines} for a Graph or SnapshotView."""
+    blocks = defaultdict(list)
+    for s, p, o in graph.triples((None, None, None)):
+        blocks[s].append(f"{ntriples_term(p)} {ntriples_term(o)}")
+    return {s: hashlib.sha1("\n".join(sorted(lines)).encode("utf-8")).digest() for s, lines in blocks.items()}
+
+
+def _block(graph, subject):
+    return {(p, o) for _, p, o in graph.triples((subject, None, None))}
+
+
+def diff_graphs(old, new):
+    """
+    Changeset turning `old` into `new` (rdflib Graphs or SnapshotViews; `old`
+    may be None for a scheme without previous output).
+
+    Returns a dict with the subjects `added`, `removed` and `changed` (sorted),
+    `predicates` {subject: {predicate: {"added": [objects], "removed": [objects]}}}
+    for the changed subjects, and the `additions` and `deletions` triple lists.
+    """
+    oldHashes = block_hashes(old) if old is not None else {}
+    newHashes = block_hashes(new)
+    added = sorted(s for s in newHashes if s not in oldHashes)
+    removed = sorted(s for s in oldHashes if s not in newHashes)
+    changed = sorted(s for s, digest in newHashes.items() if oldHashes.get(s, digest) != digest)
+
+    additions, deletions = [], []
+    for s in removed:
+        deletions.extend((s, p, o) for p, o in sorted(_block(old, s)))
+    for s in added:
+        additions.extend((s, p, o) for p, o in sorted(_block(new, s)))
+    predicates = {}
+    for s in changed:
+        before, after = _block(old, s), _block(new, s)
+        byPredicate = defaultdict(lambda: {"added": [], "removed": []})
+        for p, o in sorted(before - after):
+            deletions.append((s, p, o))
+            byPredicate[p]["removed"].append(o)
+        for p, o in sorted(after - before):
+            additions.append((s, p, o))
+            byPredicate[p]["added"].append(o)
+        predicates[s] = dict(byPredicate)
+    return {
+        "added": added,
+        "removed": removed,
+        "changed": changed,
+        "predicates": predicates,
+        "additions": additions,
+        "deletions": deletions,
+    }
+
+
+def change_counts(changes):
+    return {
+        "added": len(changes["added"]),
+        "removed": len(changes["removed"]),
+        "changed": len(changes["changed"]),
+        "triplesAdded": len(changes["additions"]),
+        "triplesRemoved": len(changes["deletions"]),
+    }
+
+
+def is_empty(changes):
+    return not changes["additions"] and not changes["deletions"]
+
+
+# ---------------------------------------------------------------------------
+# Output
+# ---------------------------------------------------------------------------
+def changeset_summary(changes, schemeURI, previousHash=None, outputHash=None):
+    """JSON-serialisable report: concept IDs (URI minus the scheme base) and N-Triples objects."""
+    base = str(schemeURI) + "/"
+
+    def local(uri):
+        uri = str(uri)
+        return uri[len(base):] if uri.startswith(base) else uri
+
+    perPredicate = defaultdict(lambda: {"added": 0, "removed": 0})
+    for _, p, _ in changes["additions"]:
+        perPredicate[str(p)]["added"] += 1
+    for _, p, _ in changes["deletions"]:
+        perPredicate[str(p)]["removed"] += 1
+    return {
+        "scheme": str(schemeURI),
+        "base": base,
+        "prev": version_uri(previousHash),
+        "id": version_uri(outputHash),
+        "counts": change_counts(changes),
+        "predicates": dict(sorted(perPredicate.items())),
+        "added": [local(s) for s in changes["added"]],
+        "removed": [local(s) for s in changes["removed"]],
+        "changed": {
+            local(s): {
+                str(p): {kind: [ntriples_term(o) for o in objects] for kind, objects in diff.items() if objects}
+                for p, diff in sorted(changes["predicates"][s].items())
+            }
+            for s in changes["changed"]
+        },
+    }
+
+
+def rdf_patch(changes, previousHash=None, outputHash=None):
+    """The changeset as one RDF Patch transaction (deletions first)."""
+    lines = []
+    if outputHash:
+        lines.append(f"H id <{version_uri(outputHash)}> .")
+    if previousHash:
+        lines.append(f"H prev <{version_uri(previousHash)}> .")
+    lines.append("TX .")
+    for code, triples in (("D", changes["deletions"]), ("A", changes["additions"])):
+        lines.extend(f"{code} {ntriples_term(s)} {ntriples_term(p)} {ntriples_term(o)} ." for s, p, o in triples)
+    lines.append("TC .")
+    return "\n".join(lines) + "\n"
+
+
+def write_changeset(outPath, changes, schemeURI, previousHash=None, outputHash=None):
+    """Write ttl/<scheme>_changes.json and .rdfp next to `outPath`. Returns both paths."""
+    summary = changeset_summary(changes, schemeURI, previousHash, outputHash)
+    jsonPath, patchPath = changes_path(outPath, ".json"), changes_path(outPath, ".rdfp")
+    write_if_changed(jsonPath, (json.dumps(summary, ensure_ascii=False, indent=1) + "\n").encode("utf-8"))
+    write_if_changed(patchPath, rdf_patch(changes, previousHash, outputHash).encode("utf-8"))
+    return jsonPath, patchPath
+
+
+def format_counts(counts):
+    return (
+        f"+{counts['added']} -{counts['removed']} ~{counts['changed']} concepts, "
+        f"+{counts['triplesAdded']} -{counts['triplesRemoved']} triples"
+    )
+
+
+# ---------------------------------------------------------------------------
+# CLI: compare two converted outputs
+# ---------------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Semantic changeset between two converted schemes.")
+    parser.add_argument("old", help="previous Turtle/N-Triples output")
+    parser.add_argument("new", help="current Turtle/N-Triples output")
+    parser.add_argument("--patch", help="write the RDF Patch to this file")
+    parser.add_argument("--json", help="write the JSON changeset to this file")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    with load_view(args.old) as old, load_view(args.new) as new:
+        changes = diff_graphs(old, new)
+        schemeURI = new.value(None, RDF.type, SKOS.ConceptScheme)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(changeset_summary(changes, schemeURI, old.ttlHash, new.ttlHash), f, ensure_ascii=False, indent=1)
+                f.write("\n")
+        if args.patch:
+            with open(args.patch, "w", encoding="utf-8") as f:
+                f.write(rdf_patch(changes, old.ttlHash, new.ttlHash))
+    print(f"{args.old} → {args.new}: {format_counts(change_counts(changes))} ({time.perf_counter() - start:.2f} s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,301 @@
+"""
+Binary snapshots of converted scheme graphs.
+
+Re-parsing ttl/<scheme>_modified.ttl with rdflib is the slowest part of every
+downstream step. The converter therefore also writes a snapshot next to each
+output, named after it (<scheme>_modified.ttl.snapshot, .nt.snapshot): every
+distinct term is interned to an integer ID once and the graph is stored as a
+sorted table of (s, p, o) ID triples.
+
+File layout (all integers little-endian):
+
+    magic       8 bytes   b"KVSNAP1\\n"
+    headerLen   uint32    length of the JSON header
+    header      JSON      {"ttlHash", "namespaces", "terms", "triples"}
+    padding               up to a multiple of 4 bytes
+    table       uint32    3 × triples IDs, sorted by (s, p, o)
+
+The header carries the SHA-256 of the Turtle it was built from; a snapshot
+whose hash does not match the .ttl on disk is stale and gets rebuilt.
+
+    from graphSnapshot import load_graph, load_view
+    g = load_graph("ttl/ackerbau_modified.ttl")        # rdflib.Graph
+    view = load_view("ttl/ackerbau_modified.ttl")      # read-only, mmap-backed
+    for s, p, o in view.triples((None, SKOS.broader, None)): ...
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from rdflib import BNode, Graph, Literal, URIRef
+
+from buildManifest import file_digest, write_atomic
+
+MAGIC = b"KVSNAP1\n"
+SNAPSHOT_SUFFIX = ".snapshot"
+
+# The table is read through a uint32 memoryview, which uses native byte order
+_NATIVE_LE = sys.byteorder == "little"
+
+
+# ---------------------------------------------------------------------------
+# Term interning
+# ---------------------------------------------------------------------------
+def term_key(term):
+    """JSON-serialisable, hashable key of an rdflib term."""
+    if isinstance(term, URIRef):
+        return ("U", str(term))
+    if isinstance(term, BNode):
+        return ("B", str(term))
+    if isinstance(term, Literal):
+        return ("L", str(term), term.language, str(term.datatype) if term.datatype else None)
+    raise TypeError(f"Cannot intern {term!r}")
+
+
+def key_term(key):
+    kind = key[0]
+    if kind == "U":
+        return URIRef(key[1])
+    if kind == "B":
+        return BNode(key[1])
+    _, value, lang, datatype = key
+    return Literal(value, lang=lang, datatype=URIRef(datatype) if datatype else None)
+
+
+class TermDictionary:
+    """Bidirectional term ↔ integer ID mapping."""
+
+    def __init__(self, keys=()):
+        self.keys = []
+        self._ids = {}
+        self._terms = {}  # ID → rdflib term, decoded on first use
+        for key in keys:
+            self.intern_key(tuple(key))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def intern_key(self, key):
+        termID = self._ids.get(key)
+        if termID is None:
+            termID = self._ids[key] = len(self.keys)
+            self.keys.append(key)
+        return termID
+
+    def intern(self, term):
+        return self.intern_key(term_key(term))
+
+    def lookup(self, term):
+        """ID of `term`, or None if it was never interned."""
+        return self._ids.get(term_key(term))
+
+    def term(self, termID):
+        term = self._terms.get(termID)
+        if term is None:
+            term = self._terms[termID] = key_term(self.keys[termID])
+        return term
+
+
+# ---------------------------------------------------------------------------
+# Writing
+# ---------------------------------------------------------------------------
+def snapshot_path(ttlPath):
+    # The output's extension stays in the name, so the Turtle and N-Triples
+    # outputs of one scheme do not overwrite each other's snapshot
+    return ttlPath + SNAPSHOT_SUFFIX
+
+
+def encode_snapshot(graph, ttlHash):
+    """Snapshot bytes for `graph`, tagged with the hash of the Turtle it belongs to."""
+    # Intern in sorted key order so the same graph always gives the same file
+    keys = sorted({term_key(t) for triple in graph for t in triple}, key=lambda k: tuple(x or "" for x in k))
+    terms = TermDictionary(keys)
+    rows = sorted((terms._ids[term_key(s)], terms._ids[term_key(p)], terms._ids[term_key(o)]) for s, p, o in graph)
+    table = array("I", (termID for row in rows for termID in row))
+    if not _NATIVE_LE:
+        table.byteswap()
+
+    header = json.dumps(
+        {
+            "ttlHash": ttlHash,
+            "namespaces": sorted([prefix, str(ns)] for prefix, ns in graph.namespaces()),
+            "terms": terms.keys,
+            "triples": len(rows),
+        },
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    padding = -(len(MAGIC) + 4 + len(header)) % 4
+    return b"".join([MAGIC, struct.pack("<I", len(header)), header, b" " * padding, table.tobytes()])
+
+
+def write_snapshot(graph, ttlPath, ttlHash=None):
+    """Write the snapshot for `graph` next to `ttlPath`. Returns the snapshot path."""
+    if ttlHash is None:
+        ttlHash = file_digest(ttlPath)
+    path = snapshot_path(ttlPath)
+    write_atomic(path, encode_snapshot(graph, ttlHash))
+    return path
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+def read_header(path):
+    """(header dict, byte offset of the triple table)."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path}: not a graph snapshot")
+        (headerLen,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(headerLen))
+    offset = len(MAGIC) + 4 + headerLen
+    return header, offset + (-offset % 4)
+
+
+def snapshot_is_current(ttlPath, ttlHash=None):
+    path = snapshot_path(ttlPath)
+    if not os.path.exists(path) or not os.path.exists(ttlPath):
+        return False
+    try:
+        header, _ = read_header(path)
+    except (ValueError, struct.error):
+        return False
+    return header.get("ttlHash") == (ttlHash or file_digest(ttlPath))
+
+
+class SnapshotView:
+    """
+    Read-only triple view over a memory-mapped snapshot.
+
+    `triples` takes an rdflib-style (s, p, o) pattern with None as wildcard.
+    Patterns with a bound subject are answered by binary search on the
+    sorted table; everything else scans it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        header, offset = read_header(path)
+        self.ttlHash = header["ttlHash"]
+        self.namespaces = [tuple(ns) for ns in header["namespaces"]]
+        self.terms = TermDictionary(header["terms"])
+        self._size = header["triples"]
+        with open(path, "rb") as f:
+            if self._size and _NATIVE_LE:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._buffer = memoryview(self._mmap)
+                self._table = self._buffer[offset:offset + 12 * self._size].cast("I")
+            else:
+                self._mmap = None
+                f.seek(offset)
+                self._table = array("I")
+                self._table.frombytes(f.read(12 * self._size))
+                if not _NATIVE_LE:
+                    self._table.byteswap()
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        return self.triples((None, None, None))
+
+    def close(self):
+        if self._mmap is not None:
+            self._table.release()
+            self._buffer.release()
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _subject_range(self, sID):
+        table = self._table
+        lo, hi = 0, self._size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if table[3 * mid] < sID:
+                lo = mid + 1
+            else:
+                hi = mid
+        start = lo
+        hi = self._size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if table[3 * mid] <= sID:
+                lo = mid + 1
+            else:
+                hi = mid
+        return start, lo
+
+    def triple_ids(self, pattern):
+        """Yield (s, p, o) ID triples matching a pattern of IDs (None = wildcard)."""
+        sID, pID, oID = pattern
+        table = self._table
+        start, stop = self._subject_range(sID) if sID is not None else (0, self._size)
+        for i in range(3 * start, 3 * stop, 3):
+            s, p, o = table[i], table[i + 1], table[i + 2]
+            if (pID is None or p == pID) and (oID is None or o == oID):
+                yield s, p, o
+
+    def triples(self, pattern):
+        ids = []
+        for term in pattern:
+            if term is None:
+                ids.append(None)
+            else:
+                termID = self.terms.lookup(term)
+                if termID is None:
+                    return
+                ids.append(termID)
+        term = self.terms.term
+        for s, p, o in self.triple_ids(ids):
+            yield term(s), term(p), term(o)
+
+    def subjects(self, predicate=None, object=None):
+        seen = set()
+        for s, _, _ in self.triples((None, predicate, object)):
+            if s not in seen:
+                seen.add(s)
+                yield s
+
+    def objects(self, subject=None, predicate=None):
+        for _, _, o in self.triples((subject, predicate, None)):
+            yield o
+
+    def value(self, subject=None, predicate=None, object=None):
+        for s, p, o in self.triples((subject, predicate, object)):
+            return o if object is None else s
+        return None
+
+    def to_graph(self):
+        g = Graph()
+        for prefix, ns in self.namespaces:
+            g.bind(prefix, ns)
+        for triple in self.triples((None, None, None)):
+            g.add(triple)
+        return g
+
+
+# ---------------------------------------------------------------------------
+# Loader API
+# ---------------------------------------------------------------------------
+def load_view(ttlPath):
+    """SnapshotView for a Turtle file, (re)building the snapshot if it is missing or stale."""
+    ttlHash = file_digest(ttlPath)
+    if not snapshot_is_current(ttlPath, ttlHash):
+        g = Graph()
+        g.parse(ttlPath, format="turtle")
+        write_snapshot(g, ttlPath, ttlHash)
+    return SnapshotView(snapshot_path(ttlPath))
+
+
+def load_graph(ttlPath):
+    """rdflib Graph for a Turtle file, read from its snapshot when that is current."""
+    with load_view(ttlPath) as view:
+        return view.to_graph()
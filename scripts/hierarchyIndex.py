@@ -0,0 +1,313 @@
+"""
+Precomputed broader/narrower hierarchy per scheme.
+
+The site's tree rendering and ad-hoc faceting queries keep walking the
+broader/narrower graph recursively. The converter can instead write
+ttl/<scheme>_hierarchy.json, built from the graph in a few linear passes:
+
+    {
+      "scheme": "https://www.w3id.org/KulturVok/terms/ackerbau",
+      "base": "https://www.w3id.org/KulturVok/terms/ackerbau/",
+      "roots": ["A16787", ...],
+      "order": ["A16787", "C1B2D3", ...],          # pre-order of the primary tree
+      "concepts": {
+        "C1B2D3": {"depth": 1, "path": ["A16787"], "pre": 1, "size": 4, "descendants": 3},
+        ...
+      },
+      "polyhierarchy": {"F764BC": ["A16787", "B8B9F7"]},   # concepts with > 1 parent
+      "cycles": [["B8B9F7", "F764BC"], ["F764BC", "B8B9F7"]],  # (child, parent) edges on a cycle
+      "ttlHash": "9f86d0…"                         # SHA-256 of the output it was built from
+    }
+
+Concepts are keyed by their local ID (URI minus "base"). Every concept hangs
+in a primary tree under its first parent on a shortest path from a top
+concept (ties broken by ID), which fixes its depth and breadcrumb `path`.
+Its subtree in that tree is the slice order[pre : pre + size]. Concepts
+reached through a second parent are not in that slice, so `descendants`
+counts the distinct descendants over all parents, and HierarchyIndex.
+descendants() adds the subtrees of secondary children.
+
+Cycles are the strongly connected components of the broader graph (Tarjan,
+iterative); every edge inside a component with more than one concept, and
+every self-loop, is listed. The same pass visits the components children
+first, so the descendant counts are one bottom-up union over it: subtrees
+without secondary edges are exact by their size, the others OR together
+bitsets of pre-order positions (O(n / 64) per union).
+
+Like the label shards, a sidecar whose ttlHash differs from the output on
+disk is stale; load_current_hierarchy_index returns None for it.
+
+    index = HierarchyIndex.load("ttl/ackerbau_hierarchy.json")
+    index.breadcrumb("F764BC")      # ["A16787", "B8B9F7", "F764BC"]
+    index.descendants("A16787")     # every concept below A16787
+"""
+import json
+import os
+from collections import deque
+
+from rdflib.namespace import RDF, SKOS
+
+from buildManifest import file_digest, write_if_changed
+
+HIERARCHY_SUFFIX = "_hierarchy.json"
+
+
+def hierarchy_path(outPath):
+    """Sidecar next to ttl/<scheme>_modified.ttl: ttl/<scheme>_hierarchy.json."""
+    directory, name = os.path.split(outPath)
+    return os.path.join(directory, name.split("_modified")[0] + HIERARCHY_SUFFIX)
+
+
+# ---------------------------------------------------------------------------
+# Building
+# ---------------------------------------------------------------------------
+def build_hierarchy_index(g, schemeURI):
+    """Hierarchy index (a JSON-serialisable dict) of the concepts in `g`."""
+    base = str(schemeURI) + "/"
+
+    def local(uri):
+        uri = str(uri)
+        return uri[len(base):] if uri.startswith(base) else uri
+
+    concepts = sorted(local(c) for c in g.subjects(RDF.type, SKOS.Concept))
+    parents = {c: set() for c in concepts}
+    for child, parent in g.subject_objects(SKOS.broader):
+        if local(child) in parents and local(parent) in parents:
+            parents[local(child)].add(local(parent))
+    for parent, child in g.subject_objects(SKOS.narrower):
+        if local(child) in parents and local(parent) in parents:
+            parents[local(child)].add(local(parent))
+    children = {c: [] for c in concepts}
+    for c in concepts:
+        for p in parents[c]:
+            children[p].append(c)  # concepts are sorted, so children lists are too
+
+    # ---- Primary tree: BFS from the roots gives shortest-path depths -------
+    roots = [c for c in concepts if not parents[c]]
+    primary = {}
+    depth = {}
+    queue = deque()
+    for start in roots + concepts:
+        # Concepts whose every ancestor lies on a cycle are unreachable from
+        # the roots; each such group is entered at its smallest ID
+        if start in depth:
+            continue
+        primary[start] = None
+        depth[start] = 0
+        queue.append(start)
+        while queue:
+            c = queue.popleft()
+            for child in children[c]:
+                if child not in depth:
+                    primary[child] = c
+                    depth[child] = depth[c] + 1
+                    queue.append(child)
+
+    treeChildren = {c: [] for c in concepts}
+    treeRoots = []
+    for c in concepts:
+        (treeChildren[primary[c]] if primary[c] is not None else treeRoots).append(c)
+
+    # ---- Pre-order numbering and subtree sizes -------------------------------
+    order = []
+    pre = {}
+    stack = list(reversed(treeRoots))
+    while stack:
+        c = stack.pop()
+        pre[c] = len(order)
+        order.append(c)
+        stack.extend(reversed(treeChildren[c]))
+    size = dict.fromkeys(concepts, 1)
+    for c in reversed(order):
+        if primary[c] is not None:
+            size[primary[c]] += size[c]
+
+    # ---- Cycles: strongly connected components -------------------------------
+    components = list(_strongly_connected(concepts, children))
+    component = {c: i for i, members in enumerate(components) for c in members}
+    cycles = [[c, p] for c in concepts for p in sorted(parents[c]) if component[c] == component[p]]
+    polyhierarchy = {c: sorted(parents[c]) for c in concepts if len(parents[c]) > 1}
+
+    # ---- Distinct descendant counts ------------------------------------------
+    # A subtree without secondary edges (a child whose primary parent is
+    # another concept) holds exactly the descendants. Otherwise the reach of
+    # a component is the union of its members and its children's reach, as
+    # a bitset over pre-order positions; components come children first, and
+    # a bitset is dropped once every edge into its component has used it
+    hasSecondary = [0] * (len(order) + 1)
+    for i, c in enumerate(order):
+        secondary = any(primary[child] != c for child in children[c])
+        hasSecondary[i + 1] = hasSecondary[i] + secondary
+
+    def exact(c):
+        return hasSecondary[pre[c] + size[c]] == hasSecondary[pre[c]]
+
+    pendingUses = [0] * len(components)
+    for c in concepts:
+        for child in children[c]:
+            if component[child] != component[c]:
+                pendingUses[component[child]] += 1
+    reach = {}
+    descendants = {}
+    for i, members in enumerate(components):
+        if len(members) == 1 and exact(members[0]):
+            descendants[members[0]] = size[members[0]] - 1
+            continue
+        bits = 0
+        for c in members:
+            bits |= 1 << pre[c]
+            for child in children[c]:
+                j = component[child]
+                if j == i:
+                    continue
+                bits |= reach[j] if j in reach else ((1 << size[child]) - 1) << pre[child]
+                pendingUses[j] -= 1
+                if not pendingUses[j]:
+                    reach.pop(j, None)
+        if pendingUses[i]:
+            reach[i] = bits
+        for c in members:
+            descendants[c] = bits.bit_count() - 1
+
+    return {
+        "scheme": str(schemeURI),
+        "base": base,
+        "roots": roots,
+        "order": order,
+        "concepts": {
+            c: {
+                "depth": depth[c], "path": _path(c, primary), "pre": pre[c], "size": size[c],
+                "descendants": descendants[c],
+            }
+            for c in concepts
+        },
+        "polyhierarchy": polyhierarchy,
+        "cycles": cycles,
+    }
+
+
+def _strongly_connected(nodes, successors):
+    """
+    Strongly connected components (lists of nodes), by an iterative Tarjan.
+    A component is yielded after every component reachable from it.
+    """
+    index, low = {}, {}
+    stack, onStack = [], set()
+
+    def visit(node):
+        index[node] = low[node] = len(index)
+        stack.append(node)
+        onStack.add(node)
+        return node, iter(successors[node])
+
+    for root in nodes:
+        if root in index:
+            continue
+        work = [visit(root)]
+        while work:
+            node, successorIter = work[-1]
+            for succ in successorIter:
+                if succ not in index:
+                    work.append(visit(succ))
+                    break
+                if succ in onStack:
+                    low[node] = min(low[node], index[succ])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    members = []
+                    while True:
+                        member = stack.pop()
+                        onStack.discard(member)
+                        members.append(member)
+                        if member == node:
+                            break
+                    yield members
+
+
+def _path(c, primary):
+    path = []
+    p = primary[c]
+    while p is not None:
+        path.append(p)
+        p = primary[p]
+    path.reverse()
+    return path
+
+
+def write_hierarchy_index(outPath, index, ttlHash=None):
+    """
+    Write the index next to `outPath` as compact, deterministic JSON (only if
+    it changed), tagged with the output's SHA-256 (`ttlHash`, computed from
+    `outPath` if not given). Returns True if written.
+    """
+    if ttlHash is None:
+        ttlHash = file_digest(outPath)
+    data = json.dumps({**index, "ttlHash": ttlHash}, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return write_if_changed(hierarchy_path(outPath), (data + "\n").encode("utf-8"))
+
+
+def load_current_hierarchy_index(outPath, ttlHash=None):
+    """HierarchyIndex of the sidecar next to `outPath`, or None if it is missing or was built from another output."""
+    path = hierarchy_path(outPath)
+    if not os.path.exists(path):
+        return None
+    index = HierarchyIndex.load(path)
+    return index if index.ttlHash == (ttlHash or file_digest(outPath)) else None
+
+
+# ---------------------------------------------------------------------------
+# Lookups
+# ---------------------------------------------------------------------------
+class HierarchyIndex:
+    def __init__(self, index):
+        self.index = index
+        self.ttlHash = index.get("ttlHash")
+        self.concepts = index["concepts"]
+        self.order = index["order"]
+        # Parent → children outside its primary subtree: second parents of
+        # polyhierarchical concepts and the parents on cycle-closing edges
+        self._secondaryChildren = {}
+        edges = [(child, p) for child, parents in index["polyhierarchy"].items() for p in parents]
+        for child, p in edges + [tuple(edge) for edge in index["cycles"]]:
+            path = self.concepts[child]["path"]
+            if (not path or p != path[-1]) and child not in self._secondaryChildren.get(p, ()):
+                self._secondaryChildren.setdefault(p, []).append(child)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def uri(self, conceptID):
+        return self.index["base"] + conceptID
+
+    def depth(self, conceptID):
+        return self.concepts[conceptID]["depth"]
+
+    def breadcrumb(self, conceptID):
+        """Local IDs from the top concept down to `conceptID` (primary tree)."""
+        return self.concepts[conceptID]["path"] + [conceptID]
+
+    def subtree(self, conceptID):
+        """`conceptID` and everything below it in the primary tree, in pre-order."""
+        entry = self.concepts[conceptID]
+        return self.order[entry["pre"]:entry["pre"] + entry["size"]]
+
+    def descendants(self, conceptID):
+        """Every concept below `conceptID` over all parents (excluding itself), as a set."""
+        result = set()
+        pending = [conceptID]
+        while pending:
+            top = pending.pop()
+            if top in result:
+                continue  # its whole subtree is in already
+            for c in self.subtree(top):
+                if c not in result:
+                    result.add(c)
+                    pending.extend(self._secondaryChildren.get(c, ()))
+        result.discard(conceptID)
+        return result
@@ -0,0 +1,99 @@
+"""
+Persistent (scheme, source localID) → minted ID ledger.
+
+Concept URIs used to be handed out from the schemeUUIDDict.json pools in
+document order, so reordering a source or inserting a single concept shifted
+every URI after it. The ledger remembers each assignment instead: re-runs
+reuse the ID a concept already has and only concepts never seen before get a
+new one.
+
+On disk it is an append-only file with one JSON array per line,
+
+    ["ackerbau", "Ablagen", "F764BC"]
+
+which is loaded into a dict for O(1) lookups. An ID is given to at most one
+concept across all schemes. Writers take an exclusive flock on the file and
+re-read whatever other processes appended in the meantime before minting,
+so schemes can be converted in parallel against the same ledger.
+"""
+import fcntl
+import json
+import os
+from collections import defaultdict
+
+LEDGER_FILE = "idLedger.jsonl"
+
+
+class IdLedger:
+    def __init__(self, path=LEDGER_FILE):
+        self.path = path
+        self._ids = {}                 # (scheme, localID) → minted ID
+        self._used = defaultdict(set)  # scheme → minted IDs
+        self._allUsed = set()          # minted IDs of every scheme
+        self._offset = 0               # bytes of the file already loaded
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                self._load(f)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def get(self, scheme, localID):
+        return self._ids.get((scheme, localID))
+
+    def used(self, scheme=None):
+        """IDs already minted for `scheme`, or for any scheme (read-only view)."""
+        return frozenset(self._allUsed if scheme is None else self._used[scheme])
+
+    def _load(self, f):
+        """Read entries appended since the last load; stops before a partial last line."""
+        f.seek(self._offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            self._offset += len(line)
+            scheme, localID, mintedID = json.loads(line)
+            self._ids[(scheme, localID)] = mintedID
+            self._used[scheme].add(mintedID)
+            self._allUsed.add(mintedID)
+
+    def assign(self, scheme, localIDs, candidates):
+        """
+        Return {localID: ID} for every localID of `scheme`.
+
+        Known localIDs keep their ledger entry. Unseen ones are given the next
+        ID from the `candidates` iterator that no scheme uses yet, and the new
+        entries are appended to the ledger under an exclusive lock. A lazy
+        `candidates` generator runs under that lock, after the reload, so it
+        may consult used() to avoid what other processes minted.
+        """
+        with open(self.path, "a+b") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                self._load(f)
+                if f.seek(0, os.SEEK_END) != self._offset:
+                    # Torn last line of a writer that died mid-append
+                    f.truncate(self._offset)
+                mapping = {}
+                newLines = []
+                used, allUsed = self._used[scheme], self._allUsed
+                for localID in localIDs:
+                    mintedID = self._ids.get((scheme, localID))
+                    if mintedID is None:
+                        mintedID = next((c for c in candidates if c not in allUsed), None)
+                        if mintedID is None:
+                            raise RuntimeError(f"Ran out of candidate IDs for scheme {scheme!r}")
+                        self._ids[(scheme, localID)] = mintedID
+                        used.add(mintedID)
+                        allUsed.add(mintedID)
+                        newLines.append(json.dumps([scheme, localID, mintedID], ensure_ascii=False) + "\n")
+                    mapping[localID] = mintedID
+                if newLines:
+                    data = "".join(newLines).encode("utf-8")
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                    self._offset += len(data)
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        return mapping
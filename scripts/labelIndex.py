@@ -0,0 +1,202 @@
+"""
+Prebuilt label search index, one shard per scheme and language.
+
+The converter already has every skos:prefLabel, altLabel and hiddenLabel in
+memory, so it can write a ready-made index instead of every consumer (site
+search, batch matching) rebuilding one. Labels are normalised with
+normalize_label:
+
+    "Gefäß (Trink-)"  →  "gefaess trink"
+
+i.e. case-folded, umlauts and ß folded to ae/oe/ue/ss, other diacritics
+dropped and punctuation turned into single spaces. A shard
+ttl/<scheme>_labels.<lang>.json holds
+
+    labels       [[conceptID, kind, label], ...]       kind: pref / alt / hidden
+    normalized   {normalised label: [label numbers]}   exact lookups
+    prefixes     {token prefix: [label numbers]}       search-as-you-type
+    ttlHash      SHA-256 of the output the shard was built from
+
+where prefixes maps every prefix of MIN_PREFIX to MAX_PREFIX characters of
+every token (and every whole token) to the labels containing it. A shard
+whose ttlHash differs from the output on disk is stale, whatever the file
+times say (write_if_changed leaves an unchanged shard's mtime alone). altLabel
+literals of the legacy exports pack several labels into one string separated
+by commas ("Napf (Henkel-, Tasse), Schale"); each part, split outside
+parentheses, is also a key in `normalized`.
+
+    index = LabelIndex.load("ttl/ackerbau_labels.de.json")
+    index.lookup("Streichmass")     # ["A1176F"]
+    index.search("eisen pfl")       # concepts with tokens starting eisen… and pfl…
+"""
+import json
+import os
+import re
+import unicodedata
+from collections import defaultdict
+
+from rdflib import Literal
+from rdflib.namespace import SKOS
+
+from buildManifest import file_digest, write_if_changed
+
+LABEL_PROPS = {SKOS.prefLabel: "pref", SKOS.altLabel: "alt", SKOS.hiddenLabel: "hidden"}
+KIND_RANK = {"pref": 0, "alt": 1, "hidden": 2}
+NO_LANG = "und"
+
+MIN_PREFIX = 2
+MAX_PREFIX = 12
+
+FOLDS = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss", "ẞ": "ss"})
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize_label(text):
+    """Case- and accent-folded form of a label, words separated by single spaces."""
+    text = text.casefold().translate(FOLDS)
+    text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+    return _NON_WORD.sub(" ", text).strip()
+
+
+def split_packed(label):
+    """Parts of a comma-separated label list, ignoring commas inside parentheses."""
+    parts, depth, start = [], 0, 0
+    for i, c in enumerate(label):
+        if c == "(":
+            depth += 1
+        elif c == ")":
+            depth = max(depth - 1, 0)
+        elif c == "," and depth == 0:
+            parts.append(label[start:i])
+            start = i + 1
+    parts.append(label[start:])
+    return [part.strip() for part in parts if part.strip()]
+
+
+def prefixes(token):
+    """Index keys of one normalised token."""
+    keys = {token[:n] for n in range(MIN_PREFIX, min(len(token), MAX_PREFIX) + 1)}
+    keys.add(token)
+    return keys
+
+
+def label_index_path(outPath, lang):
+    """Shard next to ttl/<scheme>_modified.ttl: ttl/<scheme>_labels.<lang>.json."""
+    directory, name = os.path.split(outPath)
+    return os.path.join(directory, f"{name.split('_modified')[0]}_labels.{lang}.json")
+
+
+# ---------------------------------------------------------------------------
+# Building
+# ---------------------------------------------------------------------------
+def build_label_index(g, schemeURI):
+    """{lang: shard dict} for all labels in `g`."""
+    base = str(schemeURI) + "/"
+    labels = defaultdict(list)
+    for prop, kind in LABEL_PROPS.items():
+        for s, label in g.subject_objects(prop):
+            if not isinstance(label, Literal):
+                continue
+            s = str(s)
+            conceptID = s[len(base):] if s.startswith(base) else s
+            labels[label.language or NO_LANG].append((conceptID, kind, str(label)))
+
+    shards = {}
+    for lang, entries in labels.items():
+        entries.sort(key=lambda e: (e[0], KIND_RANK[e[1]], e[2]))
+        normalized = defaultdict(set)
+        prefixIndex = defaultdict(set)
+        for i, (_, kind, label) in enumerate(entries):
+            parts = [label] + (split_packed(label) if kind != "pref" and "," in label else [])
+            for part in parts:
+                key = normalize_label(part)
+                if key:
+                    normalized[key].add(i)
+            for token in normalize_label(label).split():
+                for key in prefixes(token):
+                    prefixIndex[key].add(i)
+        shards[lang] = {
+            "scheme": str(schemeURI),
+            "base": base,
+            "lang": lang,
+            "labels": [list(e) for e in entries],
+            "normalized": {k: sorted(v) for k, v in normalized.items()},
+            "prefixes": {k: sorted(v) for k, v in prefixIndex.items()},
+        }
+    return shards
+
+
+def write_label_index(outPath, shards, ttlHash=None):
+    """
+    Write one shard per language next to `outPath`, tagged with the output's
+    SHA-256 (`ttlHash`, computed from `outPath` if not given). Returns the
+    shard paths.
+    """
+    if ttlHash is None:
+        ttlHash = file_digest(outPath)
+    paths = []
+    for lang, shard in sorted(shards.items()):
+        path = label_index_path(outPath, lang)
+        shard = {**shard, "ttlHash": ttlHash}
+        data = json.dumps(shard, ensure_ascii=False, sort_keys=True, separators=(",", ":")) + "\n"
+        write_if_changed(path, data.encode("utf-8"))
+        paths.append(path)
+    return paths
+
+
+def load_current_label_index(outPath, lang, ttlHash=None):
+    """LabelIndex of the shard next to `outPath`, or None if it is missing or was built from another output."""
+    path = label_index_path(outPath, lang)
+    if not os.path.exists(path):
+        return None
+    index = LabelIndex.load(path)
+    return index if index.ttlHash == (ttlHash or file_digest(outPath)) else None
+
+
+# ---------------------------------------------------------------------------
+# Lookups
+# ---------------------------------------------------------------------------
+class LabelIndex:
+    def __init__(self, shard):
+        self.shard = shard
+        self.ttlHash = shard.get("ttlHash")
+        self.lang = shard["lang"]
+        self.labels = shard["labels"]
+        self.normalized = shard["normalized"]
+        self.prefixes = shard["prefixes"]
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def uri(self, conceptID):
+        return self.shard["base"] + conceptID
+
+    def _concepts(self, labelNumbers):
+        """Concept IDs of the given labels, best label kind first, without duplicates."""
+        ranked = sorted(labelNumbers, key=lambda i: (KIND_RANK[self.labels[i][1]], self.labels[i][0]))
+        return list(dict.fromkeys(self.labels[i][0] for i in ranked))
+
+    def lookup(self, text):
+        """Concepts with a label that normalises to the same string as `text`."""
+        return self._concepts(self.normalized.get(normalize_label(text), ()))
+
+    def search(self, query, limit=None):
+        """Concepts having, for every word of `query`, a label token starting with it."""
+        tokens = normalize_label(query).split()
+        if not tokens:
+            return []
+        hits = None
+        for token in tokens:
+            found = set(self.prefixes.get(token[:MAX_PREFIX], ()))
+            if len(token) > MAX_PREFIX:
+                # Keys stop at MAX_PREFIX characters; check the rest on the labels
+                found = {i for i in found if any(
+                    t.startswith(token) for t in normalize_label(self.labels[i][2]).split()
+                )}
+            hits = found if hits is None else hits & found
+            if not hits:
+                return []
+        concepts = self._concepts(hits)
+        return concepts[:limit] if limit is not None else concepts
@@ -0,0 +1,160 @@
+"""
+Stage timings and counters for the conversion pipeline.
+
+A Metrics object travels with one scheme through the converter. Each stage
+is timed with
+
+    with metrics.stage("parse.xml"):
+        ...
+
+which adds the stage's wall-clock and CPU seconds to its totals (a stage
+entered several times, such as the fuzzy lookups, accumulates). Stage names
+are dotted; a stage nested in another ("parse.rewrite.fuzzy" in
+"parse.rewrite") is included in its parent's time and memory.
+
+On Linux each stage restarts the process's RSS high-water mark on entry
+(writing "5" to /proc/self/clear_refs) and reads VmHWM on exit, so
+"peakRssMiB" is the highest RSS while that stage ran, over all its calls.
+Where the mark cannot be reset, the stage instead reports "maxRssGrowthMiB":
+how far its calls raised the process's lifetime peak RSS, which is 0 for a
+stage that stays below an earlier peak, however much memory it uses.
+
+Counters are plain named integers (metrics.count("mergedElements", 2)).
+"""
+import os
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+METRICS_FILE = "conversionMetrics.json"
+
+CLEAR_REFS = "/proc/self/clear_refs"
+PROC_STATUS = "/proc/self/status"
+
+_resettable = os.path.exists(CLEAR_REFS)
+_peakBeforeReset = 0  # highest high-water mark discarded by reset_peak_rss, in bytes
+
+
+def peak_rss(who=None):
+    """Peak resident set size in bytes of this process (or of its waited-for children), None if unknown."""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF if who is None else who)
+    # ru_maxrss is in kilobytes on Linux, in bytes on macOS
+    peak = usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+    # Resetting the high-water mark also lowers ru_maxrss of this process
+    return max(peak, _peakBeforeReset) if who is None else peak
+
+
+def rss_high_water():
+    """VmHWM of this process in bytes: its peak RSS since start or since the last reset_peak_rss."""
+    with open(PROC_STATUS, "rb") as f:
+        for line in f:
+            if line.startswith(b"VmHWM:"):
+                return int(line.split()[1]) * 1024
+    raise OSError(f"no VmHWM in {PROC_STATUS}")
+
+
+def reset_peak_rss():
+    """
+    Restart this process's RSS high-water mark at its current RSS (Linux 4.0+).
+    Returns the mark before the reset in bytes, None if it cannot be reset.
+    """
+    global _resettable, _peakBeforeReset
+    if not _resettable:
+        return None
+    try:
+        peak = rss_high_water()
+        with open(CLEAR_REFS, "w") as f:
+            f.write("5")
+    except OSError:
+        _resettable = False
+        return None
+    _peakBeforeReset = max(_peakBeforeReset, peak)
+    return peak
+
+
+def _mib(size):
+    return round(size / 2**20, 1) if size is not None else None
+
+
+class Metrics:
+    def __init__(self):
+        # name → {"calls", "wallSeconds", "cpuSeconds", "peakRssMiB" or "maxRssGrowthMiB"}
+        self.stages = {}
+        self.counters = Counter()
+        self._openPeaks = []  # peak RSS so far of each open stage, outermost first
+
+    @contextmanager
+    def stage(self, name):
+        # The reset discards the enclosing stage's peak so far; keep it aside
+        outerPeak = reset_peak_rss()
+        if outerPeak is not None and self._openPeaks:
+            self._openPeaks[-1] = max(self._openPeaks[-1], outerPeak)
+        self._openPeaks.append(0)
+        startPeak = peak_rss() if outerPeak is None else None
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            entry = self.stages.setdefault(name, {"calls": 0, "wallSeconds": 0.0, "cpuSeconds": 0.0})
+            entry["calls"] += 1
+            entry["wallSeconds"] += wall
+            entry["cpuSeconds"] += cpu
+            peak = self._openPeaks.pop()
+            if outerPeak is not None:
+                peak = max(peak, rss_high_water())
+                if self._openPeaks:
+                    self._openPeaks[-1] = max(self._openPeaks[-1], peak)
+                entry["peakRssMiB"] = max(entry.get("peakRssMiB", 0), _mib(peak))
+            elif startPeak is not None:
+                entry["maxRssGrowthMiB"] = entry.get("maxRssGrowthMiB", 0) + (peak_rss() - startPeak) / 2**20
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def as_dict(self):
+        return {
+            "stages": {
+                name: {
+                    **entry,
+                    "wallSeconds": round(entry["wallSeconds"], 4),
+                    "cpuSeconds": round(entry["cpuSeconds"], 4),
+                    **({"maxRssGrowthMiB": round(entry["maxRssGrowthMiB"], 1)} if "maxRssGrowthMiB" in entry else {}),
+                }
+                for name, entry in self.stages.items()
+            },
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+
+def run_totals(wallSeconds, schemes=()):
+    """
+    Wall and CPU seconds and peak RSS of the whole run, worker processes
+    included. A worker's stages reset its high-water mark, so its peak as
+    seen at exit can be too low; the stage peaks in `schemes` (per-scheme
+    Metrics.as_dict() results) make up for that.
+    """
+    cpu = time.process_time()
+    peaks = [peak_rss()]
+    if resource is not None:
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        cpu += children.ru_utime + children.ru_stime
+        peaks.append(peak_rss(resource.RUSAGE_CHILDREN))
+    peakMiB = _mib(max(peaks)) if peaks[0] is not None else None
+    stagePeaks = [
+        stage["peakRssMiB"] for scheme in schemes for stage in scheme.get("stages", {}).values()
+        if "peakRssMiB" in stage
+    ]
+    return {
+        "wallSeconds": round(wallSeconds, 4),
+        "cpuSeconds": round(cpu, 4),
+        "peakRssMiB": max([peakMiB, *stagePeaks]) if peakMiB is not None else None,
+    }
@@ -0,0 +1,191 @@
+"""
+Deterministic, streaming Turtle and N-Triples output for converted schemes.
+
+rdflib's Turtle serializer builds the whole document in memory and orders
+subjects by how often they are referenced, so adding one narrower concept can
+move its parent to a different place in the file. The writers below emit one
+subject block at a time, in a fixed order:
+
+    1. subjects without skos:notation (the ConceptScheme), by URI
+    2. concepts, by (skos:notation, URI)
+
+Inside a block predicates and objects are ordered the way rdflib orders them
+(rdf:type first, then by URI / term order), and the Turtle block layout is
+the same as in ttl/*.ttl and data/*.ttl, so switching writers only reorders
+blocks. N-Triples output is canonical (RDF 1.1: no prefixes, only \\ " LF
+and CR escaped) with the lines of each block sorted.
+
+    with open("ttl/ackerbau_modified.ttl", "wb") as f:
+        write_turtle(g, f)
+"""
+import re
+
+from rdflib import BNode, Literal, URIRef
+from rdflib.namespace import RDF, SKOS, XSD
+
+FORMATS = {"turtle": ".ttl", "nt": ".nt"}
+
+INDENT = "    "
+
+# Local names written as prefix:name; anything else stays a full <IRI>
+_LOCAL_NAME = re.compile(r"[A-Za-z_][A-Za-z0-9_\-]*\Z")
+
+# xsd types written without quotes when the value is well-formed (as rdflib does;
+# xsd:double is left quoted rather than reformatted in exponent notation)
+_PLAIN_TYPES = frozenset({XSD.integer, XSD.decimal, XSD.boolean})
+
+
+# ---------------------------------------------------------------------------
+# Subject order
+# ---------------------------------------------------------------------------
+def ordered_subjects(graph):
+    """Subjects without a notation (by URI), then concepts by (notation, URI)."""
+    notations = {}
+    for s, notation in graph.subject_objects(SKOS.notation):
+        if s not in notations or str(notation) < notations[s]:
+            notations[s] = str(notation)
+    others = sorted({s for s in graph.subjects() if s not in notations}, key=_subject_key)
+    concepts = sorted(notations, key=lambda s: (notations[s], _subject_key(s)))
+    return others + concepts
+
+
+def _subject_key(s):
+    return (isinstance(s, BNode), str(s))
+
+
+# ---------------------------------------------------------------------------
+# Term formatting
+# ---------------------------------------------------------------------------
+def quote_turtle(value):
+    """Quoted Turtle string, using the same escapes as rdflib."""
+    if "\n" in value:
+        encoded = value.replace("\\", "\\\\")
+        if '"""' in value:
+            encoded = encoded.replace('"""', '\\"\\"\\"')
+        if encoded[-1] == '"' and encoded[-2] != "\\":
+            encoded = encoded[:-1] + '\\"'
+        return '"""%s"""' % encoded.replace("\r", "\\r")
+    return '"%s"' % value.replace("\\", "\\\\").replace('"', '\\"').replace("\r", "\\r")
+
+
+def quote_ntriples(value):
+    """Canonical N-Triples string literal."""
+    return '"%s"' % (
+        value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n").replace("\r", "\\r")
+    )
+
+
+def ntriples_term(term):
+    if isinstance(term, URIRef):
+        return f"<{term}>"
+    if isinstance(term, BNode):
+        return f"_:{term}"
+    encoded = quote_ntriples(term)
+    if term.language:
+        return f"{encoded}@{term.language}"
+    if term.datatype and term.datatype != XSD.string:
+        return f"{encoded}^^<{term.datatype}>"
+    return encoded
+
+
+class TurtleTerms:
+    """Formats terms as Turtle, abbreviating URIs with the graph's bound prefixes."""
+
+    def __init__(self, namespaces):
+        # Longest namespace first, so the most specific prefix wins
+        self._namespaces = sorted(((str(ns), prefix) for prefix, ns in namespaces), key=lambda x: -len(x[0]))
+        self._labels = {}
+        self.used = {}  # prefix → namespace of every prefix written so far
+
+    def uri(self, uri):
+        label = self._labels.get(uri)
+        if label is None:
+            label = f"<{uri}>"
+            for namespace, prefix in self._namespaces:
+                if uri.startswith(namespace) and _LOCAL_NAME.match(uri, len(namespace)):
+                    label = f"{prefix}:{uri[len(namespace):]}"
+                    self.used[prefix] = namespace
+                    break
+            self._labels[uri] = label
+        return label
+
+    def literal(self, term):
+        datatype = term.datatype
+        if datatype in _PLAIN_TYPES and term.value is not None:
+            if datatype == XSD.boolean:
+                return str(term).lower()
+            if datatype == XSD.decimal and not any(c in term for c in ".eE"):
+                return f"{term}.0"
+            return str(term)
+        if datatype is not None and term.language is None:
+            return f"{quote_turtle(term)}^^{self.uri(datatype)}"
+        if term.language:
+            return f"{quote_turtle(term)}@{term.language}"
+        return quote_turtle(term)
+
+    def term(self, term):
+        if isinstance(term, URIRef):
+            return self.uri(term)
+        if isinstance(term, BNode):
+            return f"_:{term}"
+        return self.literal(term)
+
+
+# ---------------------------------------------------------------------------
+# Writers
+# ---------------------------------------------------------------------------
+def _predicate_objects(graph, subject):
+    properties = {}
+    for p, o in graph.predicate_objects(subject):
+        properties.setdefault(p, []).append(o)
+    for objects in properties.values():
+        objects.sort()
+    order = sorted(properties)
+    if RDF.type in properties:
+        order.remove(RDF.type)
+        order.insert(0, RDF.type)
+    return [(p, properties[p]) for p in order]
+
+
+def turtle_block(graph, subject, terms):
+    lines = []
+    for p, objects in _predicate_objects(graph, subject):
+        verb = "a" if p == RDF.type else terms.uri(p)
+        labels = [terms.term(o) for o in objects]
+        lines.append(f"{verb} " + f",\n{INDENT}{INDENT}".join(labels))
+    return f"{terms.term(subject)} " + f" ;\n{INDENT}".join(lines) + " .\n"
+
+
+def write_turtle(graph, out):
+    """Stream `graph` as Turtle to the binary file `out`."""
+    terms = TurtleTerms(graph.namespaces())
+    subjects = ordered_subjects(graph)
+    # The prefix header lists only the prefixes the body uses, so every URI
+    # is labelled once before the first block is written (labels are cached)
+    for s, p, o in graph:
+        # rdf:type is written as "a" and needs no prefix
+        for node in (s, None if p == RDF.type else p, o.datatype if isinstance(o, Literal) else o):
+            if isinstance(node, URIRef):
+                terms.uri(node)
+    header = [f"@prefix {prefix}: <{ns}> .\n" for prefix, ns in sorted(terms.used.items())]
+    out.write("".join(header).encode("utf-8"))
+    for subject in subjects:
+        out.write(("\n" + turtle_block(graph, subject, terms)).encode("utf-8"))
+    out.write(b"\n")
+
+
+def write_ntriples(graph, out):
+    """Stream `graph` as canonical N-Triples to the binary file `out`."""
+    for subject in ordered_subjects(graph):
+        s = ntriples_term(subject)
+        lines = sorted(
+            f"{s} <{p}> {ntriples_term(o)} .\n" for p, o in graph.predicate_objects(subject)
+        )
+        out.write("".join(lines).encode("utf-8"))
+
+
+WRITERS = {"turtle": write_turtle, "nt": write_ntriples}
+
+
+def write_graph(graph, out, format="turtle"):
+    WRITERS[format](graph, out)
@@ -0,0 +1,374 @@
+"""
+All converted schemes as one dataset of named graphs.
+
+Six separate rdflib Graphs repeat the same terms over and over (the license
+URI on every concept, the dct:creator literals, dct:created dates), and any
+cross-scheme question means loading all of them again. SchemeDataset holds
+every scheme as a named graph (named by its ConceptScheme URI) on top of one
+shared TermDictionary: each distinct term is stored once, and the quads
+themselves are a flat uint32 table of (graph, subject, predicate, object)
+IDs, sorted by subject within each graph. Schemes are read from their graph
+snapshots, which are merged ID by ID without creating rdflib terms.
+
+    dataset = SchemeDataset.from_outputs(glob.glob("ttl/*_modified.ttl"))
+    dataset.lookup_label("Tasse")            # [(graph, concept, predicate, label), ...] in every scheme
+    dataset.shared_labels(["moebel", "gefaess"])
+    with open("ttl/kulturvok.trig", "wb") as f:
+        write_dataset(dataset, f, "trig")
+
+The converter builds it with --dataset; standalone:
+
+    python schemeDataset.py --out ttl/kulturvok.nq
+    python schemeDataset.py --label Tasse --shared moebel gefaess
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from array import array
+from collections import defaultdict
+
+from rdflib import Literal
+from rdflib.namespace import RDF, SKOS
+
+from buildManifest import AtomicOutput
+from graphSnapshot import TermDictionary, load_view
+from labelIndex import LABEL_PROPS, normalize_label, split_packed
+from rdfWriter import TurtleTerms, ntriples_term, ordered_subjects, turtle_block
+
+DATASET_FORMATS = {".trig": "trig", ".nq": "nquads"}
+
+
+class NamedGraph:
+    """Read-only view of one graph of a SchemeDataset, with the Graph methods rdfWriter uses."""
+
+    def __init__(self, dataset, name):
+        self.dataset = dataset
+        self.identifier = name
+
+    def __len__(self):
+        start, stop = self.dataset._ranges[self.dataset.terms.lookup(self.identifier)]
+        return stop - start
+
+    def __iter__(self):
+        return self.triples((None, None, None))
+
+    def namespaces(self):
+        return iter(self.dataset.namespaces)
+
+    def triples(self, pattern):
+        for s, p, o, _ in self.dataset.quads((*pattern, self.identifier)):
+            yield s, p, o
+
+    def subjects(self, predicate=None, object=None):
+        seen = set()
+        for s, _, _ in self.triples((None, predicate, object)):
+            if s not in seen:
+                seen.add(s)
+                yield s
+
+    def objects(self, subject=None, predicate=None):
+        for _, _, o in self.triples((subject, predicate, None)):
+            yield o
+
+    def subject_objects(self, predicate=None):
+        for s, _, o in self.triples((None, predicate, None)):
+            yield s, o
+
+    def predicate_objects(self, subject=None):
+        for _, p, o in self.triples((subject, None, None)):
+            yield p, o
+
+    def value(self, subject=None, predicate=None, object=None):
+        for s, _, o in self.triples((subject, predicate, object)):
+            return o if object is None else s
+        return None
+
+
+class SchemeDataset:
+    def __init__(self):
+        self.terms = TermDictionary()
+        self.namespaces = []
+        self._table = array("I")  # 4 IDs per quad: graph, subject, predicate, object
+        self._ranges = {}         # graph ID → (first quad, end quad)
+        self._byObject = None     # quad numbers sorted by object ID, built on first use
+        self._labels = None       # normalised label → quad numbers, built on first use
+
+    @classmethod
+    def from_outputs(cls, ttlPaths):
+        """Dataset of converted schemes, read from their graph snapshots."""
+        dataset = cls()
+        for ttlPath in sorted(ttlPaths):
+            with load_view(ttlPath) as view:
+                dataset.add_view(view.value(None, RDF.type, SKOS.ConceptScheme), view)
+        return dataset
+
+    def __len__(self):
+        return len(self._table) // 4
+
+    # ---- Building -----------------------------------------------------------
+    def add_view(self, name, view):
+        """Add a SnapshotView as graph `name`, translating its term IDs into the shared dictionary."""
+        shared = [self.terms.intern_key(key) for key in view.terms.keys]
+        rows = sorted((shared[s], shared[p], shared[o]) for s, p, o in view.triple_ids((None, None, None)))
+        self._add_rows(name, rows, view.namespaces)
+
+    def add_graph(self, name, graph):
+        """Add an rdflib Graph as graph `name`."""
+        intern = self.terms.intern
+        rows = sorted((intern(s), intern(p), intern(o)) for s, p, o in graph)
+        self._add_rows(name, rows, graph.namespaces())
+
+    def _add_rows(self, name, rows, namespaces):
+        graphID = self.terms.intern(name)
+        if graphID in self._ranges:
+            raise ValueError(f"Graph {name} is already in the dataset")
+        start = len(self)
+        table = self._table
+        for row in rows:
+            table.append(graphID)
+            table.extend(row)
+        self._ranges[graphID] = (start, len(self))
+        for prefix, namespace in namespaces:
+            if (prefix, str(namespace)) not in self.namespaces:
+                self.namespaces.append((prefix, str(namespace)))
+        self._byObject = self._labels = None
+
+    # ---- Triple access -----------------------------------------------------
+    def graphs(self):
+        """Graph names, sorted."""
+        return sorted(self.terms.term(graphID) for graphID in self._ranges)
+
+    def graph(self, name):
+        if self.terms.lookup(name) not in self._ranges:
+            raise KeyError(name)
+        return NamedGraph(self, name)
+
+    def resolve_graph(self, name):
+        """Graph name for a full scheme URI or its last path segment ("moebel")."""
+        for graph in self.graphs():
+            if str(graph) == str(name) or str(graph).rsplit("/", 1)[-1] == name:
+                return graph
+        raise KeyError(name)
+
+    def _subject_range(self, sID, start, stop):
+        table = self._table
+        lo, hi = start, stop
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if table[4 * mid + 1] < sID:
+                lo = mid + 1
+            else:
+                hi = mid
+        first, hi = lo, stop
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if table[4 * mid + 1] <= sID:
+                lo = mid + 1
+            else:
+                hi = mid
+        return first, lo
+
+    def _object_quads(self, oID):
+        table = self._table
+        if self._byObject is None:
+            self._byObject = array("I", sorted(range(len(self)), key=lambda q: table[4 * q + 3]))
+        byObject = self._byObject
+        lo, hi = 0, len(byObject)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if table[4 * byObject[mid] + 3] < oID:
+                lo = mid + 1
+            else:
+                hi = mid
+        while lo < len(byObject) and table[4 * byObject[lo] + 3] == oID:
+            yield byObject[lo]
+            lo += 1
+
+    def quad_ids(self, pattern):
+        """Yield (s, p, o, g) ID quads matching a pattern of IDs (None = wildcard)."""
+        sID, pID, oID, gID = pattern
+        table = self._table
+        if gID is not None:
+            ranges = [self._ranges[gID]] if gID in self._ranges else []
+        else:
+            ranges = sorted(self._ranges.values())
+        if oID is not None and sID is None:
+            # Bound object: go through the object index instead of scanning
+            for q in sorted(self._object_quads(oID)):
+                i = 4 * q
+                if (gID is None or table[i] == gID) and (pID is None or table[i + 2] == pID):
+                    yield table[i + 1], table[i + 2], table[i + 3], table[i]
+            return
+        for start, stop in ranges:
+            if sID is not None:
+                start, stop = self._subject_range(sID, start, stop)
+            for i in range(4 * start, 4 * stop, 4):
+                if (pID is None or table[i + 2] == pID) and (oID is None or table[i + 3] == oID):
+                    yield table[i + 1], table[i + 2], table[i + 3], table[i]
+
+    def quads(self, pattern):
+        """Yield (s, p, o, graph) term quads for an rdflib-style pattern (None = wildcard)."""
+        ids = []
+        for term in pattern:
+            if term is None:
+                ids.append(None)
+            else:
+                termID = self.terms.lookup(term)
+                if termID is None:
+                    return
+                ids.append(termID)
+        term = self.terms.term
+        for s, p, o, g in self.quad_ids(ids):
+            yield term(s), term(p), term(o), term(g)
+
+    # ---- Cross-scheme queries ------------------------------------------------
+    def _label_index(self):
+        if self._labels is None:
+            kinds = {self.terms.lookup(p): kind for p, kind in LABEL_PROPS.items()}
+            keys = {}  # object ID → normalised keys; each distinct literal is normalised once
+            index = defaultdict(list)
+            table = self._table
+            for q in range(len(self)):
+                i = 4 * q
+                kind = kinds.get(table[i + 2])
+                if kind is None or self.terms.keys[table[i + 3]][0] != "L":
+                    continue
+                oID = table[i + 3]
+                if oID not in keys:
+                    label = self.terms.keys[oID][1]
+                    parts = [label] + (split_packed(label) if kind != "pref" and "," in label else [])
+                    keys[oID] = {normalize_label(part) for part in parts} - {""}
+                for key in keys[oID]:
+                    index[key].append(q)
+            self._labels = index
+        return self._labels
+
+    def _label_quads(self, quadNumbers, graphs=None):
+        graphIDs = None if graphs is None else {self.terms.lookup(self.resolve_graph(g)) for g in graphs}
+        term = self.terms.term
+        table = self._table
+        for q in quadNumbers:
+            i = 4 * q
+            if graphIDs is None or table[i] in graphIDs:
+                yield term(table[i]), term(table[i + 1]), term(table[i + 2]), term(table[i + 3])
+
+    def lookup_label(self, text, graphs=None):
+        """
+        Concepts with a pref/alt/hidden label that normalises like `text`, as
+        (graph, concept, label predicate, label) tuples, optionally only in
+        `graphs` (names or URIs).
+        """
+        quadNumbers = self._label_index().get(normalize_label(text), ())
+        return sorted(self._label_quads(quadNumbers, graphs))
+
+    def shared_labels(self, graphs=None, minGraphs=2):
+        """
+        Normalised labels that occur in at least `minGraphs` of `graphs` (default:
+        all), as {label: {graph: [concepts]}}.
+        """
+        shared = {}
+        for key, quadNumbers in self._label_index().items():
+            byGraph = defaultdict(set)
+            for graph, concept, _, _ in self._label_quads(quadNumbers, graphs):
+                byGraph[graph].add(concept)
+            if len(byGraph) >= minGraphs:
+                shared[key] = {g: sorted(concepts) for g, concepts in sorted(byGraph.items())}
+        return dict(sorted(shared.items()))
+
+    def stats(self):
+        return {"graphs": len(self._ranges), "quads": len(self), "terms": len(self.terms)}
+
+
+# ---------------------------------------------------------------------------
+# Writers
+# ---------------------------------------------------------------------------
+def write_nquads(dataset, out):
+    """Stream the dataset as N-Quads (graphs by name, blocks as in rdfWriter) to the binary file `out`."""
+    for name in dataset.graphs():
+        g = ntriples_term(name)
+        graph = dataset.graph(name)
+        for subject in ordered_subjects(graph):
+            s = ntriples_term(subject)
+            lines = sorted(f"{s} <{p}> {ntriples_term(o)} {g} .\n" for p, o in graph.predicate_objects(subject))
+            out.write("".join(lines).encode("utf-8"))
+
+
+def write_trig(dataset, out):
+    """Stream the dataset as TriG, one graph block per scheme, to the binary file `out`."""
+    terms = TurtleTerms(dataset.namespaces)
+    for name in dataset.graphs():
+        terms.uri(name)
+    for s, p, o, _ in dataset.quads((None, None, None, None)):
+        # rdf:type is written as "a" and needs no prefix
+        for node in (s, None if p == RDF.type else p, o.datatype if isinstance(o, Literal) else o):
+            if node is not None and not isinstance(node, Literal):
+                terms.term(node)
+    header = [f"@prefix {prefix}: <{ns}> .\n" for prefix, ns in sorted(terms.used.items())]
+    out.write("".join(header).encode("utf-8"))
+    for name in dataset.graphs():
+        graph = dataset.graph(name)
+        blocks = [turtle_block(graph, subject, terms) for subject in ordered_subjects(graph)]
+        out.write(f"\n{terms.term(name)} {{\n{chr(10).join(blocks)}}}\n".encode("utf-8"))
+
+
+WRITERS = {"trig": write_trig, "nquads": write_nquads}
+
+
+def dataset_format(path):
+    extension = os.path.splitext(path)[1]
+    if extension not in DATASET_FORMATS:
+        raise ValueError(f"{path}: dataset files end in {' or '.join(DATASET_FORMATS)}")
+    return DATASET_FORMATS[extension]
+
+
+def write_dataset(dataset, out, format="trig"):
+    WRITERS[format](dataset, out)
+
+
+def build_dataset_file(ttlPaths, path):
+    """Merge converted outputs into the TriG/N-Quads file `path` (only rewritten if it changed)."""
+    dataset = SchemeDataset.from_outputs(ttlPaths)
+    with AtomicOutput(path) as out:
+        write_dataset(dataset, out, dataset_format(path))
+    return dataset, out.written
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Merge converted schemes into one dataset and query across them.")
+    parser.add_argument("outputs", nargs="*", help="converted Turtle files (default: ttl/*_modified.ttl)")
+    parser.add_argument("--out", help=f"write the dataset ({', '.join(DATASET_FORMATS)})")
+    parser.add_argument("--label", action="append", default=[], help="list concepts with this label in every scheme")
+    parser.add_argument("--shared", nargs="*", metavar="SCHEME", help="list labels shared by these schemes (default: all)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    outputs = args.outputs or sorted(glob.glob("ttl/*_modified.ttl"))
+    if args.out:
+        dataset, written = build_dataset_file(outputs, args.out)
+    else:
+        dataset = SchemeDataset.from_outputs(outputs)
+    stats = dataset.stats()
+    print(
+        f"{stats['graphs']} graphs, {stats['quads']} quads, {stats['terms']} distinct terms "
+        f"({time.perf_counter() - start:.2f} s){f' → {args.out}' if args.out else ''}"
+    )
+
+    for text in args.label:
+        print(f"{text}:")
+        for graph, concept, predicate, label in dataset.lookup_label(text):
+            print(f"  {graph.rsplit('/', 1)[-1]:16s} {concept}  {predicate.rsplit('#', 1)[-1]} \"{label}\"")
+    if args.shared is not None:
+        shared = dataset.shared_labels(args.shared or None)
+        print(f"{len(shared)} labels shared by {', '.join(args.shared) or 'at least two schemes'}")
+        for key, byGraph in shared.items():
+            print(f"  {key}: " + "; ".join(f"{g.rsplit('/', 1)[-1]} {len(c)}" for g, c in byGraph.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,332 @@
+"""
+SHACL validation of converted schemes against shapes/skohub.shacl.ttl.
+
+The Gatsby build validates every vocabulary with rdf-validate-shacl, i.e.
+only after conversion and a full Node build. This module runs the same
+shapes on the Python side, directly on the graph the converter still holds
+in memory, so a broken conversion fails before the site build starts.
+
+It implements the part of SHACL Core the shapes file uses: sh:targetClass
+node shapes, property shapes with a predicate sh:path, and the minCount,
+maxCount, datatype, nodeKind, class, uniqueLang and or constraint components.
+Loading a shapes graph that uses any other constraint component raises a
+ValueError rather than silently skipping it.
+
+    python shaclValidation.py                      # all ttl/*_modified.ttl
+    python shaclValidation.py -j 4 --fail-fast --report validationReport.json
+"""
+import argparse
+import glob
+import json
+import sys
+import time
+import traceback
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.collection import Collection
+from rdflib.namespace import RDF, RDFS, SH, XSD
+
+SHAPES_FILE = "../shapes/skohub.shacl.ttl"
+REPORT_FILE = "validationReport.json"
+
+SEVERITIES = {SH.Violation: "Violation", SH.Warning: "Warning", SH.Info: "Info"}
+
+NODE_KINDS = {
+    SH.IRI: (URIRef,),
+    SH.BlankNode: (BNode,),
+    SH.Literal: (Literal,),
+    SH.BlankNodeOrIRI: (BNode, URIRef),
+    SH.BlankNodeOrLiteral: (BNode, Literal),
+    SH.IRIOrLiteral: (URIRef, Literal),
+}
+
+# SHACL Core parameters it does not implement
+_UNSUPPORTED = {
+    SH[name] for name in (
+        "targetNode", "targetSubjectsOf", "targetObjectsOf", "minExclusive", "minInclusive",
+        "maxExclusive", "maxInclusive", "minLength", "maxLength", "pattern", "flags",
+        "languageIn", "equals", "disjoint", "lessThan", "lessThanOrEquals", "not", "and",
+        "xone", "node", "qualifiedValueShape", "closed", "ignoredProperties", "hasValue",
+        "in", "sparql",
+    )
+}
+
+
+# ---------------------------------------------------------------------------
+# Shapes
+# ---------------------------------------------------------------------------
+class Shape:
+    """A node shape (path is None) or a property shape, with its constraints."""
+
+    def __init__(self, shapes, node):
+        self.node = node
+        self.path = shapes.value(node, SH.path)
+        if self.path is not None and not isinstance(self.path, URIRef):
+            raise ValueError(f"{node}: only predicate paths are supported")
+        self.name = shape_name(shapes, node, self.path)
+        self.severity = SEVERITIES[shapes.value(node, SH.severity) or SH.Violation]
+        message = shapes.value(node, SH.message)
+        self.message = str(message) if message is not None else None
+        self.deactivated = shapes.value(node, SH.deactivated) == Literal(True)
+        self.targetClasses = sorted(shapes.objects(node, SH.targetClass))
+
+        self.minCount = _int(shapes.value(node, SH.minCount))
+        self.maxCount = _int(shapes.value(node, SH.maxCount))
+        self.datatypes = list(shapes.objects(node, SH.datatype))
+        self.nodeKinds = [NODE_KINDS[kind] for kind in shapes.objects(node, SH.nodeKind)]
+        self.classes = list(shapes.objects(node, SH["class"]))
+        self.uniqueLang = shapes.value(node, SH.uniqueLang) == Literal(True)
+        self.properties = [Shape(shapes, p) for p in shapes.objects(node, SH.property)]
+        self.ors = [
+            [Shape(shapes, member) for member in Collection(shapes, head)]
+            for head in shapes.objects(node, SH["or"])
+        ]
+
+
+def _int(value):
+    return int(value) if value is not None else None
+
+
+def shape_name(shapes, node, path):
+    if isinstance(node, URIRef):
+        return shapes.namespace_manager.normalizeUri(node)
+    if path is not None:
+        return f"[{shapes.namespace_manager.normalizeUri(path)}]"
+    return "[]"
+
+
+@lru_cache(maxsize=None)
+def load_shapes(path=SHAPES_FILE):
+    """Node shapes of a shapes file (parsed once per process)."""
+    shapes = Graph()
+    shapes.parse(path, format="turtle")
+    for p in set(shapes.predicates()):
+        if p in _UNSUPPORTED:
+            raise ValueError(f"{path}: {p} is not supported by this validator")
+    nodes = set(shapes.subjects(RDF.type, SH.NodeShape)) | set(shapes.subjects(SH.targetClass))
+    return [Shape(shapes, node) for node in sorted(nodes)]
+
+
+# ---------------------------------------------------------------------------
+# Validation
+# ---------------------------------------------------------------------------
+class _FailFast(Exception):
+    pass
+
+
+class _Context:
+    """Data graph indexes shared by all shapes."""
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.types = defaultdict(set)
+        for s, o in graph.subject_objects(RDF.type):
+            self.types[s].add(o)
+        self.superclasses = defaultdict(set)
+        for s, o in graph.subject_objects(RDFS.subClassOf):
+            self.superclasses[s].add(o)
+        self._values = {}
+
+    def instances(self, cls):
+        return sorted(s for s, types in self.types.items() if any(self.is_subclass(t, cls) for t in types))
+
+    def is_subclass(self, cls, ancestor):
+        seen, stack = set(), [cls]
+        while stack:
+            c = stack.pop()
+            if c == ancestor:
+                return True
+            if c not in seen:
+                seen.add(c)
+                stack.extend(self.superclasses[c])
+        return False
+
+    def values(self, focus, path):
+        properties = self._values.get(focus)
+        if properties is None:
+            properties = self._values[focus] = defaultdict(list)
+            for p, o in self.graph.predicate_objects(focus):
+                properties[p].append(o)
+        return properties.get(path, ())
+
+
+def _datatype(value):
+    if value.datatype is not None:
+        return value.datatype
+    return RDF.langString if value.language else XSD.string
+
+
+def _check(shape, focus, values, ctx, results, failFast):
+    """Append validation results of `shape` for one focus node and its value nodes."""
+
+    def fail(component, value=None, message=None):
+        results.append({
+            "severity": shape.severity,
+            "focusNode": str(focus),
+            "resultPath": str(shape.path) if shape.path is not None else None,
+            "value": str(value) if value is not None else None,
+            "message": shape.message or message,
+            "sourceShape": shape.name,
+            "constraint": component,
+        })
+        if failFast and shape.severity == "Violation":
+            raise _FailFast()
+
+    if shape.minCount is not None and len(values) < shape.minCount:
+        fail("MinCountConstraintComponent")
+    if shape.maxCount is not None and len(values) > shape.maxCount:
+        fail("MaxCountConstraintComponent")
+    for value in values:
+        for datatype in shape.datatypes:
+            if not isinstance(value, Literal) or _datatype(value) != datatype:
+                fail("DatatypeConstraintComponent", value)
+        for kinds in shape.nodeKinds:
+            if not isinstance(value, kinds):
+                fail("NodeKindConstraintComponent", value)
+        for cls in shape.classes:
+            if not any(ctx.is_subclass(t, cls) for t in ctx.types.get(value, ())):
+                fail("ClassConstraintComponent", value)
+    if shape.uniqueLang:
+        languages = [v.language for v in values if isinstance(v, Literal) and v.language]
+        for language in sorted({lang for lang in languages if languages.count(lang) > 1}):
+            fail("UniqueLangConstraintComponent")
+    for members in shape.ors:
+        if not any(_conforms(member, focus, ctx) for member in members):
+            alternatives = " / ".join(m.message or m.name for m in members)
+            fail("OrConstraintComponent", focus, f"None of the alternatives holds: {alternatives}")
+
+
+def _conforms(shape, focus, ctx):
+    results = []
+    _validate_node(shape, focus, ctx, results, failFast=False)
+    return not results
+
+
+def _validate_node(shape, focus, ctx, results, failFast):
+    if shape.deactivated:
+        return
+    values = ctx.values(focus, shape.path) if shape.path is not None else [focus]
+    _check(shape, focus, values, ctx, results, failFast)
+    for prop in shape.properties:
+        _validate_node(prop, focus, ctx, results, failFast)
+
+
+def validate_graph(graph, shapes=None, failFast=False):
+    """
+    Validate `graph` against node shapes (default: SHAPES_FILE).
+
+    Returns a report dict: conforms, counts per severity, and one result
+    dict per violated constraint. With `failFast`, validation stops at the
+    first Violation (the report then holds the results found so far).
+    """
+    if shapes is None:
+        shapes = load_shapes()
+    ctx = _Context(graph)
+    results = []
+    stoppedEarly = False
+    try:
+        for shape in shapes:
+            for cls in shape.targetClasses:
+                for focus in ctx.instances(cls):
+                    _validate_node(shape, focus, ctx, results, failFast)
+    except _FailFast:
+        stoppedEarly = True
+    counts = {severity: 0 for severity in SEVERITIES.values()}
+    for result in results:
+        counts[result["severity"]] += 1
+    return {
+        "conforms": not results,
+        "violations": counts["Violation"],
+        "warnings": counts["Warning"],
+        "infos": counts["Info"],
+        "stoppedEarly": stoppedEarly,
+        "results": results,
+    }
+
+
+def format_result(result):
+    return (
+        f"{result['severity']}: {result['message'] or result['constraint']}\n"
+        f"    focus node: {result['focusNode']}\n"
+        f"    path: {result['resultPath']}  value: {result['value']}  shape: {result['sourceShape']}"
+    )
+
+
+def write_report(path, reports, shapesFile=SHAPES_FILE):
+    """Write the per-scheme reports as one JSON document."""
+    document = {
+        "shapes": shapesFile,
+        "conforms": all(r["violations"] == 0 for r in reports.values()),
+        "schemes": dict(sorted(reports.items())),
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=4, ensure_ascii=False)
+        f.write("\n")
+
+
+# ---------------------------------------------------------------------------
+# CLI: validate converted outputs
+# ---------------------------------------------------------------------------
+def _validate_worker(ttlPath, shapesFile, failFast):
+    from graphSnapshot import load_graph
+
+    try:
+        return validate_graph(load_graph(ttlPath), load_shapes(shapesFile), failFast), None
+    except Exception:
+        return None, traceback.format_exc()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate converted schemes against the SkoHub SHACL shapes.")
+    parser.add_argument("outputs", nargs="*", help="Turtle files (default: ttl/*_modified.ttl)")
+    parser.add_argument("--shapes", default=SHAPES_FILE, help=f"shapes graph (default: {SHAPES_FILE})")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="schemes validated in parallel (0 = one per CPU)")
+    parser.add_argument("--fail-fast", action="store_true", help="stop at the first Violation")
+    parser.add_argument("--report", default=REPORT_FILE, help=f"JSON report (default: {REPORT_FILE})")
+    args = parser.parse_args(argv)
+
+    outputs = args.outputs or sorted(glob.glob("ttl/*_modified.ttl"))
+    reports = {}
+    failed = False
+    start = time.perf_counter()
+
+    def report(ttlPath, result, error):
+        nonlocal failed
+        if error is not None:
+            failed = True
+            print(f"FAILED: {ttlPath}\n{error}", file=sys.stderr)
+            return
+        reports[ttlPath] = result
+        print(f"  {ttlPath}: {result['violations']} violations, {result['warnings']} warnings")
+        for r in result["results"]:
+            if r["severity"] == "Violation":
+                print(format_result(r), file=sys.stderr)
+        if result["violations"]:
+            failed = True
+
+    jobs = args.jobs or None
+    if jobs != 1 and len(outputs) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {pool.submit(_validate_worker, p, args.shapes, args.fail_fast): p for p in outputs}
+            for future in as_completed(futures):
+                report(futures[future], *future.result())
+                if failed and args.fail_fast:
+                    for pending in futures:
+                        pending.cancel()
+                    break
+    else:
+        for ttlPath in outputs:
+            report(ttlPath, *_validate_worker(ttlPath, args.shapes, args.fail_fast))
+            if failed and args.fail_fast:
+                break
+
+    write_report(args.report, reports, args.shapes)
+    print(f"Validated {len(reports)}/{len(outputs)} schemes in {time.perf_counter() - start:.2f} s → {args.report}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
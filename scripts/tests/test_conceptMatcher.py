@@ -0,0 +1,72 @@
+"""
+conceptMatcher: label shards are trusted by content hash, not by file times,
+and unreadable input records become error lines instead of ending the batch.
+"""
+import io
+import json
+import os
+
+import pytest
+from rdflib import Graph, Literal, URIRef
+from rdflib.namespace import RDF, SKOS
+
+import conceptMatcher
+from conceptMatcher import _jsonl_records, load_label_index, read_records
+from labelIndex import build_label_index, label_index_path, write_label_index
+
+SCHEME = URIRef("https://example.org/scheme")
+
+
+def write_scheme(path, label):
+    g = Graph()
+    g.add((SCHEME, RDF.type, SKOS.ConceptScheme))
+    g.add((URIRef(f"{SCHEME}/C1"), RDF.type, SKOS.Concept))
+    g.add((URIRef(f"{SCHEME}/C1"), SKOS.prefLabel, Literal(label, lang="de")))
+    g.serialize(path, format="turtle")
+    return g
+
+
+def test_shard_is_rebuilt_when_its_hash_is_stale(tmp_path):
+    ttlPath = str(tmp_path / "demo_modified.ttl")
+    write_label_index(ttlPath, build_label_index(write_scheme(ttlPath, "Pflug"), SCHEME))
+    assert load_label_index(ttlPath, "de").lookup("Pflug") == ["C1"]
+
+    # A newer Turtle file under an older mtime than its shard
+    shardPath = label_index_path(ttlPath, "de")
+    write_scheme(ttlPath, "Egge")
+    shardTime = os.path.getmtime(shardPath)
+    os.utime(ttlPath, (shardTime - 10, shardTime - 10))
+    index = load_label_index(ttlPath, "de")
+    assert index.lookup("Egge") == ["C1"]
+    assert index.lookup("Pflug") == []
+
+
+def test_unreadable_jsonl_records_become_errors():
+    lines = ['{"id": "a", "term": "Pflug"}', "{broken", '{"id": "c"}', '{"term": 3}', "[1]", '"Egge"']
+    records = list(_jsonl_records(io.StringIO("\n".join(lines)), "term", "id"))
+    assert [(recordID, term) for recordID, term, _ in records] == [
+        ("a", "Pflug"), (2, None), ("c", None), (4, None), (5, None), (6, "Egge"),
+    ]
+    assert [error is None for _, _, error in records] == [True, False, False, False, False, True]
+
+
+def test_csv_rows_without_a_term_become_errors():
+    records = list(read_records(io.StringIO("id,term\na,Pflug\nb\n"), "csv"))
+    assert records == [("a", "Pflug", None), ("b", None, "row 2: no 'term' value")]
+
+
+def test_csv_without_the_term_column_is_rejected():
+    with pytest.raises(ValueError, match="'term'"):
+        read_records(io.StringIO("id,name\na,Pflug\n"), "csv")
+
+
+def test_error_lines_keep_input_order(tmp_path):
+    ttlPath = str(tmp_path / "demo_modified.ttl")
+    write_scheme(ttlPath, "Pflug")
+    inPath, outPath = tmp_path / "terms.jsonl", tmp_path / "matches.jsonl"
+    inPath.write_text('"Pflug"\n{"id": 2}\n"Pflug"\n', encoding="utf-8")
+    assert conceptMatcher.main([str(inPath), "-o", str(outPath), "--schemes", ttlPath]) == 0
+    out = [json.loads(line) for line in outPath.read_text(encoding="utf-8").splitlines()]
+    assert [record["id"] for record in out] == [1, 2, 3]
+    assert "error" in out[1] and out[1]["matches"] == {}
+    assert out[0]["matches"]["demo"][0]["uri"] == f"{SCHEME}/C1"
@@ -0,0 +1,34 @@
+"""
+FuzzyResolver against the linear scan, with and without a distance bound,
+and the size limit of its cache.
+"""
+import random
+
+from Levenshtein import distance
+
+from fuzzyResolver import FuzzyResolver, linear_resolve
+
+
+def random_keys(rng, n):
+    return ["".join(rng.choice("abcde") for _ in range(rng.randint(1, 9))) for _ in range(n)]
+
+
+def test_bounded_search_matches_the_linear_scan():
+    rng = random.Random(7)
+    keys = random_keys(rng, 300)
+    resolver = FuzzyResolver(keys)
+    for ref in random_keys(rng, 200):
+        expected = linear_resolve(ref, keys)
+        assert resolver.resolve(ref) == expected
+        best = distance(ref, expected[0])
+        for maxDistance in range(4):
+            assert resolver.resolve(ref, maxDistance) == (expected if best <= maxDistance else ())
+
+
+def test_cache_is_bounded():
+    resolver = FuzzyResolver(["abc", "abd"], cacheSize=2)
+    for ref in ["x", "y", "z", "z"]:
+        resolver.resolve(ref)
+    assert len(resolver._cache) == 2
+    assert resolver.cacheHits == 1
+    assert len(FuzzyResolver(["abc"], cacheSize=0)._cache) == 0
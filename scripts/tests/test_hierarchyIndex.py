@@ -0,0 +1,105 @@
+"""
+build_hierarchy_index on small hand-made schemes: a tree, a polyhierarchy,
+a cycle along the primary tree and a cycle made only of secondary edges.
+Descendant counts are checked against a brute-force walk.
+"""
+from rdflib import Graph, URIRef
+from rdflib.namespace import RDF, SKOS
+
+from hierarchyIndex import (
+    HierarchyIndex, build_hierarchy_index, load_current_hierarchy_index, write_hierarchy_index,
+)
+
+SCHEME = URIRef("https://example.org/scheme")
+
+
+def scheme_graph(broader, concepts=()):
+    """Graph with a concept per ID in `broader` pairs (child, parent) and `concepts`."""
+    g = Graph()
+    ids = set(concepts) | {c for edge in broader for c in edge}
+    for c in ids:
+        g.add((URIRef(f"{SCHEME}/{c}"), RDF.type, SKOS.Concept))
+    for child, parent in broader:
+        g.add((URIRef(f"{SCHEME}/{child}"), SKOS.broader, URIRef(f"{SCHEME}/{parent}")))
+    return g
+
+
+def brute_force_descendants(broader, c):
+    children = {}
+    for child, parent in broader:
+        children.setdefault(parent, set()).add(child)
+    seen, pending = set(), [c]
+    while pending:
+        for child in children.get(pending.pop(), ()):
+            if child not in seen:
+                seen.add(child)
+                pending.append(child)
+    seen.discard(c)
+    return seen
+
+
+def check_descendants(broader, index):
+    lookup = HierarchyIndex(index)
+    for c, entry in index["concepts"].items():
+        expected = brute_force_descendants(broader, c)
+        assert entry["descendants"] == len(expected), c
+        assert lookup.descendants(c) == expected, c
+
+
+def test_tree():
+    broader = [("B", "A"), ("C", "A"), ("D", "B"), ("E", "B")]
+    index = build_hierarchy_index(scheme_graph(broader), SCHEME)
+    assert index["roots"] == ["A"]
+    assert index["order"] == ["A", "B", "D", "E", "C"]
+    assert index["concepts"]["E"]["path"] == ["A", "B"]
+    assert index["concepts"]["B"]["size"] == 3
+    assert index["polyhierarchy"] == {}
+    assert index["cycles"] == []
+    check_descendants(broader, index)
+
+
+def test_polyhierarchy():
+    broader = [("B", "A"), ("C", "A"), ("D", "B"), ("D", "C"), ("E", "D"), ("F", "C")]
+    index = build_hierarchy_index(scheme_graph(broader), SCHEME)
+    assert index["polyhierarchy"] == {"D": ["B", "C"]}
+    assert index["concepts"]["D"]["path"] == ["A", "B"]
+    assert index["cycles"] == []
+    assert index["concepts"]["C"]["descendants"] == 3  # D and E through the second parent
+    check_descendants(broader, index)
+
+
+def test_cycle_along_the_primary_tree():
+    # A → B → C → B: the back edge (B, C) closes the cycle under the root
+    broader = [("B", "A"), ("C", "B"), ("B", "C")]
+    index = build_hierarchy_index(scheme_graph(broader), SCHEME)
+    assert index["cycles"] == [["B", "C"], ["C", "B"]]
+    check_descendants(broader, index)
+
+
+def test_cycle_of_secondary_edges_only():
+    # X, Y and Z are all top-level under R; X → Y → Z → X lies entirely off the primary tree
+    broader = [("X", "R"), ("Y", "R"), ("Z", "R"), ("X", "Y"), ("Y", "Z"), ("Z", "X")]
+    index = build_hierarchy_index(scheme_graph(broader), SCHEME)
+    assert index["cycles"] == [["X", "Y"], ["Y", "Z"], ["Z", "X"]]
+    assert sorted(index["polyhierarchy"]) == ["X", "Y", "Z"]
+    assert index["concepts"]["X"]["descendants"] == 2
+    check_descendants(broader, index)
+
+
+def test_self_loop_and_unreachable_cycle():
+    broader = [("A", "A"), ("P", "Q"), ("Q", "P"), ("S", "P")]
+    index = build_hierarchy_index(scheme_graph(broader, concepts=["T"]), SCHEME)
+    assert index["cycles"] == [["A", "A"], ["P", "Q"], ["Q", "P"]]
+    assert index["roots"] == ["T"]
+    check_descendants(broader, index)
+
+
+def test_sidecar_is_stale_once_the_output_changes(tmp_path):
+    outPath = str(tmp_path / "demo_modified.ttl")
+    broader = [("B", "A")]
+    scheme_graph(broader).serialize(outPath, format="turtle")
+    write_hierarchy_index(outPath, build_hierarchy_index(scheme_graph(broader), SCHEME))
+    assert load_current_hierarchy_index(outPath).subtree("A") == ["A", "B"]
+
+    scheme_graph(broader, concepts=["C"]).serialize(outPath, format="turtle")
+    assert load_current_hierarchy_index(outPath) is None
@@ -0,0 +1,71 @@
+"""
+IdLedger and mint_concept_ids: re-runs, reordered and extended sources keep
+every concept's ID, a torn last line is dropped, and IDs are unique across
+schemes.
+"""
+import pytest
+
+import vocabularyCheckupModified as converter
+from generateID import IdMinter
+from idLedger import IdLedger
+
+
+@pytest.fixture
+def pools(monkeypatch):
+    """Replace schemeUUIDDict.json with the returned (initially empty) dict."""
+    pools = {}
+    monkeypatch.setattr(converter, "_schemeUUIDDict", pools)
+    return pools
+
+
+POOL = ["A11111", "A22222", "A33333", "A44444", "A55555"]
+
+
+def test_rerun_reuses_ids(tmp_path, pools):
+    pools["s"] = list(POOL)
+    ledgerPath = str(tmp_path / "idLedger.jsonl")
+    first = converter.mint_concept_ids("s", ["x", "y", "z"], ledgerPath)
+    assert first == POOL[:3]
+    assert converter.mint_concept_ids("s", ["x", "y", "z"], ledgerPath) == first
+    # A fresh process reads the same assignments back from disk
+    assert [IdLedger(ledgerPath).get("s", localID) for localID in "xyz"] == first
+
+
+def test_reordering_and_inserting_keep_ids(tmp_path, pools):
+    pools["s"] = list(POOL)
+    ledgerPath = str(tmp_path / "idLedger.jsonl")
+    x, y, z = converter.mint_concept_ids("s", ["x", "y", "z"], ledgerPath)
+
+    assert converter.mint_concept_ids("s", ["z", "x", "y"], ledgerPath) == [z, x, y]
+    assert converter.mint_concept_ids("s", ["x", "new", "y", "z"], ledgerPath) == [x, POOL[3], y, z]
+
+
+def test_torn_last_line_is_dropped(tmp_path, pools):
+    pools["s"] = list(POOL)
+    ledgerPath = tmp_path / "idLedger.jsonl"
+    converter.mint_concept_ids("s", ["x"], str(ledgerPath))
+    with open(ledgerPath, "ab") as f:
+        f.write(b'["s", "y", "A2')  # a writer died mid-append
+
+    assert IdLedger(str(ledgerPath)).get("s", "y") is None
+    assert converter.mint_concept_ids("s", ["x", "y"], str(ledgerPath)) == [POOL[0], POOL[1]]
+    assert ledgerPath.read_text(encoding="utf-8").splitlines() == ['["s", "x", "A11111"]', '["s", "y", "A22222"]']
+
+
+def test_fresh_ids_avoid_other_schemes(tmp_path, pools, monkeypatch):
+    # An exhausted pool falls back to a minter; seed it so its first draws are known
+    first, second, third = IdMinter(seed=1).mint(3)
+    monkeypatch.setattr(converter, "IdMinter", lambda: IdMinter(seed=1))
+    pools["a"] = [first]
+    ledgerPath = str(tmp_path / "idLedger.jsonl")
+    IdLedger(ledgerPath).assign("c", ["x"], iter([second]))
+
+    assert converter.mint_concept_ids("b", ["y"], ledgerPath) == [third]
+
+
+def test_pool_ids_taken_by_another_scheme_are_skipped(tmp_path, pools):
+    ledgerPath = str(tmp_path / "idLedger.jsonl")
+    pools["a"] = ["A11111", "A22222"]
+    pools["b"] = ["A11111", "B33333"]
+    assert converter.mint_concept_ids("a", ["x"], ledgerPath) == ["A11111"]
+    assert converter.mint_concept_ids("b", ["y"], ledgerPath) == ["B33333"]
@@ -0,0 +1,44 @@
+"""
+Per-stage memory figures of Metrics.stage: a real peak where the RSS
+high-water mark can be reset (Linux), the growth of the process peak elsewhere.
+"""
+import pytest
+
+import pipelineMetrics
+from pipelineMetrics import Metrics, reset_peak_rss
+
+MiB = 2**20
+
+
+def touch(size):
+    """Allocate `size` bytes and fault every page in, then free them."""
+    buffer = bytearray(size)
+    buffer[::4096] = b"\1" * len(buffer[::4096])
+    del buffer
+
+
+@pytest.mark.skipif(reset_peak_rss() is None, reason="RSS high-water mark cannot be reset here")
+def test_stage_peak_is_its_own():
+    metrics = Metrics()
+    with metrics.stage("big"):
+        touch(64 * MiB)
+    with metrics.stage("outer"):
+        touch(32 * MiB)
+        with metrics.stage("outer.inner"):
+            pass
+    stages = metrics.as_dict()["stages"]
+    assert stages["big"]["peakRssMiB"] >= stages["outer"]["peakRssMiB"] + 24
+    # The inner stage's reset must not lose what the outer one used before it
+    assert stages["outer"]["peakRssMiB"] >= stages["outer.inner"]["peakRssMiB"] + 24
+    # ...nor may the resets hide the process's own peak
+    assert round(pipelineMetrics.peak_rss() / MiB, 1) >= stages["big"]["peakRssMiB"]
+
+
+def test_growth_is_reported_without_reset(monkeypatch):
+    monkeypatch.setattr(pipelineMetrics, "_resettable", False)
+    metrics = Metrics()
+    with metrics.stage("parse"):
+        pass
+    stage = metrics.as_dict()["stages"]["parse"]
+    assert "peakRssMiB" not in stage
+    assert stage.get("maxRssGrowthMiB", 0) >= 0
@@ -0,0 +1,75 @@
+"""
+shaclValidation against the fixtures test/validate.test.js runs through
+rdf-validate-shacl: systematik.ttl must pass (one license Warning), the
+invalid hash URI scheme must fail with the two sh:or Violations.
+"""
+import os
+
+import pytest
+from rdflib import Graph
+
+from shaclValidation import load_shapes, validate_graph
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SHAPES = os.path.join(REPO_DIR, "shapes", "skohub.shacl.ttl")
+FIXTURES = os.path.join(REPO_DIR, "test", "data", "ttl")
+
+DCT_LICENSE = "http://purl.org/dc/terms/license"
+VANN_NAMESPACE = "http://purl.org/vocab/vann/preferredNamespaceUri"
+SCHEME_SHAPE = "<http://skohub.io/skohub-shaclConceptSchemeShape>"
+
+
+def validate_fixture(name, failFast=False):
+    graph = Graph().parse(os.path.join(FIXTURES, name), format="turtle")
+    return validate_graph(graph, load_shapes(SHAPES), failFast=failFast)
+
+
+def pinned(report):
+    return sorted(
+        (r["severity"], r["constraint"], r["focusNode"], r["resultPath"], r["sourceShape"])
+        for r in report["results"]
+    )
+
+
+def test_valid_scheme_has_only_a_license_warning():
+    report = validate_fixture("systematik.ttl")
+    assert (report["violations"], report["warnings"], report["infos"]) == (0, 1, 0)
+    assert pinned(report) == [
+        ("Warning", "MinCountConstraintComponent", "https://w3id.org/kim/hochschulfaechersystematik/scheme",
+         DCT_LICENSE, "[dct:license]"),
+    ]
+
+
+def test_invalid_scheme_violations_and_warnings():
+    report = validate_fixture("invalid_hashURIConceptScheme.ttl")
+    scheme = "http://example.org/hashURIConceptScheme#scheme"
+    assert (report["violations"], report["warnings"], report["infos"]) == (2, 2, 0)
+    assert not report["conforms"] and not report["stoppedEarly"]
+    assert pinned(report) == [
+        ("Violation", "OrConstraintComponent", scheme, None, SCHEME_SHAPE),
+        ("Violation", "OrConstraintComponent", scheme, None, SCHEME_SHAPE),
+        ("Warning", "MinCountConstraintComponent", scheme, DCT_LICENSE, "[dct:license]"),
+        ("Warning", "MinCountConstraintComponent", scheme, VANN_NAMESPACE, "[vann:preferredNamespaceUri]"),
+    ]
+    messages = sorted(r["message"] for r in report["results"] if r["severity"] == "Violation")
+    assert "dct:title with a language tag" in messages[0]
+    assert "[dct:description]" in messages[0] + messages[1]
+
+
+def test_fail_fast_stops_at_first_violation():
+    report = validate_fixture("invalid_hashURIConceptScheme.ttl", failFast=True)
+    assert report["stoppedEarly"]
+    assert report["violations"] == 1
+
+
+def test_unsupported_constraint_is_rejected(tmp_path):
+    shapes = tmp_path / "shapes.ttl"
+    shapes.write_text(
+        "@prefix sh: <http://www.w3.org/ns/shacl#> .\n"
+        "@prefix skos: <http://www.w3.org/2004/02/skos/core#> .\n"
+        "<urn:s> a sh:NodeShape ; sh:targetClass skos:Concept ;\n"
+        "  sh:property [ sh:path skos:notation ; sh:pattern \"^[0-9]+$\" ] .\n",
+        encoding="utf-8",
+    )
+    with pytest.raises(ValueError, match="pattern"):
+        load_shapes(str(shapes))
@@ -0,0 +1,42 @@
+"""
+Streaming mode against the DOM mode: the same synthetic legacy source gives
+isomorphic graphs, and constructs the streaming parser cannot map are
+rejected instead of converted differently.
+"""
+import lxml.etree
+import pytest
+from rdflib.compare import isomorphic
+
+import vocabularyCheckupModified as converter
+from benchmarks.syntheticScheme import SCHEME, generate
+from vocabularyCheckupModified import build_scheme_graph, element_triples
+
+RDF_NS = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+SKOS_NS = "http://www.w3.org/2004/02/skos/core#"
+
+
+def test_streaming_matches_dom(tmp_path, monkeypatch):
+    monkeypatch.setattr(converter, "_schemeUUIDDict", {})
+    monkeypatch.setitem(converter.descriptionDict, SCHEME, {
+        "title": "Synthetische Systematik", "description": "Synthetisches Vokabular", "author": "Test",
+    })
+    source = tmp_path / f"{SCHEME}.rdf"
+    with open(source, "w", encoding="utf-8") as f:
+        generate(f, 300, seed=3)
+    # One ledger for both runs, so both modes get the same concept IDs
+    ledger = str(tmp_path / "idLedger.jsonl")
+
+    _, dom, domConcepts = build_scheme_graph(str(source), streaming=False, ledger=ledger)
+    _, streamed, streamedConcepts = build_scheme_graph(str(source), streaming=True, ledger=ledger)
+
+    assert domConcepts == streamedConcepts == 300
+    assert isomorphic(dom, streamed)
+
+
+def test_node_id_is_rejected():
+    element = lxml.etree.fromstring(
+        f'<skos:Concept xmlns:rdf="{RDF_NS}" xmlns:skos="{SKOS_NS}" rdf:nodeID="n1">'
+        f'<skos:prefLabel>Pflug</skos:prefLabel></skos:Concept>'
+    )
+    with pytest.raises(ValueError, match="nodeID"):
+        list(element_triples(element, converter.generalURI))
@@ -1,9 +1,39 @@
-import lxml.etree
+import argparse
+import cProfile
 import glob
+import hashlib
 import json
+import os
+import pstats
+import sys
+import time
+import traceback
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+from urllib.parse import urljoin
+from xml.sax.saxutils import escape
+
+import lxml.etree
 from rdflib import Graph, URIRef, Literal, Namespace
 from rdflib.namespace import SKOS, RDF, DCTERMS, XSD, VANN
-from Levenshtein import distance
+from rdflib.parser import create_input_source
+from rdflib.plugins.parsers.rdfxml import RDFXMLParser
+
+from buildManifest import (
+    MANIFEST_FILE, AtomicOutput, BuildManifest, config_digest, file_digest, write_if_changed
+)
+from fuzzyResolver import FuzzyResolver, is_mangled
+from generateID import IdMinter
+from graphDiff import change_counts, diff_graphs, format_counts, is_empty, write_changeset
+from graphSnapshot import load_graph, load_view, snapshot_is_current, write_snapshot
+from hierarchyIndex import build_hierarchy_index, load_current_hierarchy_index, write_hierarchy_index
+from idLedger import LEDGER_FILE, IdLedger
+from labelIndex import build_label_index, load_current_label_index, write_label_index
+from pipelineMetrics import METRICS_FILE, Metrics, run_totals
+from rdfWriter import FORMATS, write_graph
+from schemeDataset import DATASET_FORMATS, build_dataset_file, dataset_format
+from shaclValidation import REPORT_FILE, SHAPES_FILE, format_result, validate_graph, write_report
 
 # Legacy namespaces present in source XML — needed only to strip them from the graph
 DC  = Namespace("http://purl.org/dc/elements/1.1/")
@@ -19,7 +49,7 @@ CC_LICENSE = URIRef("http://creativecommons.org/licenses/by-nc-sa/2.0/de/")
 # ---------------------------------------------------------------------------
 # Config
 # ---------------------------------------------------------------------------
-allRdfFiles = [x for x in glob.glob("rdf-xml/*.rdf") if "modified" not in x]
+RDF_SOURCE_GLOB = "rdf-xml/*.rdf"
 LANG = "de"
 
 descriptionDict = {
@@ -56,10 +86,61 @@ descriptionDict = {
 }
 
 generalURI = "https://www.w3id.org/KulturVok/terms/"
+OUTPUT_DIR = "ttl"
+
+# Bump whenever a change to the converter alters its output, so the build
+# manifest stops treating existing outputs as current.
+CONVERTER_VERSION = "1"
+# xml:base of the museumvok exports, rebased onto generalURI
+LEGACY_BASE = "http://www.museumsvokabular.de/museumvok/"
+
+# Pre-generated IDs per scheme. New concepts are minted from these in their
+# original order, so a scheme's first run through the ledger reproduces the
+# URIs published so far.
+UUID_POOL_FILE = "schemeUUIDDict.json"
+_schemeUUIDDict = None
+
+
+def load_uuid_pools():
+    """Load the pre-generated UUID pools for each scheme (once per process)."""
+    global _schemeUUIDDict
+    if _schemeUUIDDict is None:
+        with open(UUID_POOL_FILE, "r", encoding="utf-8") as f:
+            _schemeUUIDDict = json.load(f)
+    return _schemeUUIDDict
+
+
+def candidate_ids(scheme, ledger):
+    """
+    The scheme's pool IDs in order, then freshly minted ones once it runs dry.
+    Fresh IDs avoid every scheme's pool and every ID in `ledger`; the body
+    runs lazily inside IdLedger.assign, i.e. under the ledger lock.
+    """
+    pools = load_uuid_pools()
+    yield from pools.get(scheme, [])
+    minter = IdMinter()
+    for pool in pools.values():
+        minter.exclude(pool)
+    minter.exclude(ledger.used())
+    while True:
+        yield from minter.mint(1000)
+
+
+def mint_concept_ids(scheme, localIDs, ledgerPath=LEDGER_FILE):
+    """
+    Return the ID of every concept (given by source localID, in document
+    order). IDs recorded in the ledger are reused; only unseen localIDs mint.
+    """
+    # A localID occurring twice in a source still yields two concepts
+    seen = Counter()
+    keys = []
+    for localID in localIDs:
+        seen[localID] += 1
+        keys.append(localID if seen[localID] == 1 else f"{localID}#{seen[localID]}")
+    ledger = IdLedger(ledgerPath)
+    mapping = ledger.assign(scheme, keys, candidate_ids(scheme, ledger))
+    return [mapping[key] for key in keys]
 
-# Load UUID pools for each scheme
-with open("schemeUUIDDict.json", "r", encoding="utf-8") as f:
-    schemeUUIDDict = json.load(f)
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -88,7 +169,12 @@ SKOS_LANG_TAGS = [
     SKOS_EXAMPLE,
 ]
 
+RDF_DESCRIPTION = "{http://www.w3.org/1999/02/22-rdf-syntax-ns#}Description"
+RDF_PARSE_TYPE  = "{http://www.w3.org/1999/02/22-rdf-syntax-ns#}parseType"
+RDF_DATATYPE    = "{http://www.w3.org/1999/02/22-rdf-syntax-ns#}datatype"
+RDF_LI          = "{http://www.w3.org/1999/02/22-rdf-syntax-ns#}li"
 XML_LANG = "{http://www.w3.org/XML/1998/namespace}lang"
+XML_BASE = "{http://www.w3.org/XML/1998/namespace}base"
 
 
 def set_lang(element, lang=LANG):
@@ -100,11 +186,13 @@ def merge_and_tag(parent, elements, lang=LANG):
     """
     Merge multiple sibling elements of the same predicate into one,
     joining their text with ', ', then set xml:lang on the result.
-    Single elements just get xml:lang set directly.
+    Single elements just get xml:lang set directly. Returns the number of
+    elements merged away.
     """
     if not elements:
-        return
-    if len(elements) == 1:
+        return 0
+    merged = len(elements) - 1
+    if not merged:
         set_lang(elements[0], lang)
     else:
         combined = ", ".join(e.text or "" for e in elements)
@@ -113,28 +201,195 @@ def merge_and_tag(parent, elements, lang=LANG):
             elements.pop()
         elements[0].text = combined
         set_lang(elements[0], lang)
+    return merged
 
 
 # ---------------------------------------------------------------------------
-# Main loop
+# Per-concept rewrites (shared by the DOM and the streaming mode)
 # ---------------------------------------------------------------------------
-for rdfFile in allRdfFiles:
-    with open(rdfFile, "r", encoding="utf-8") as f:
-        text = f.read()
-    text = text.replace(
-        'xml:base="http://www.museumsvokabular.de/museumvok/"',
-        f'xml:base="{generalURI}"',
+def source_local_id(about):
+    """Source rdf:about values are "scheme/localID" relative fragments."""
+    return about.split("/", 1)[-1].replace(" ", "_")
+
+
+def assign_concept_uri(element, scheme, newUUID):
+    """Point the concept at its new UUID URI and record the UUID as skos:notation."""
+    element.set(RDF_ABOUT, generalURI + scheme + "/" + newUUID)
+    notationEl = lxml.etree.SubElement(
+        element, "{http://www.w3.org/2004/02/skos/core#}notation"
     )
+    notationEl.text = newUUID
+
+
+def rewrite_concept(element, localToNew, resolver, metrics):
+    """
+    Fix concept references, drop skos:inScheme, merge multi-value text
+    properties and ensure xml:lang on all literal-valued SKOS properties.
+    Outcomes are counted in `metrics`.
+    """
+    for subElement in list(element):
+        # ---- Remap concept references (narrower/broader/related) --
+        if subElement.tag in SKOS_REF_PROPS:
+            ref = subElement.get(RDF_RESOURCE, "").replace(" ", "_")
+            localID = ref.split("/", 1)[-1]
+
+            if is_mangled(localID):
+                with metrics.stage("parse.rewrite.fuzzy"):
+                    matches = resolver.resolve(localID)
+                if len(matches) > 1:
+                    metrics.count("fuzzyAmbiguous")
+                    print(f"Multiple fuzzy matches for: {ref}")
+                    for match in matches:
+                        print(f"  {localToNew[match]}")
+                elif len(matches) == 1:
+                    metrics.count("fuzzyMatched")
+                    resolved = localToNew[matches[0]]
+                    print(f"Fuzzy match: {ref}  →  {resolved}")
+                    subElement.set(RDF_RESOURCE, resolved)
+                else:
+                    metrics.count("fuzzyUnmatched")
+                    print(f"No match for: {ref}")
+            elif localID in localToNew:
+                subElement.set(RDF_RESOURCE, localToNew[localID])
+            else:
+                metrics.count("unmappedReferences")
+                print(f"Warning: no mapping found for reference: {ref}")
+
+        # ---- Remove inScheme (re-added cleanly via rdflib) --------
+        elif subElement.tag == SKOS_INSCHEME:
+            element.remove(subElement)
+
+    # ---- Merge multi-value properties and tag all with xml:lang ---
+    for tag in SKOS_LANG_TAGS:
+        metrics.count("mergedElements", merge_and_tag(element, element.findall(tag)))
+
+
+def count_fuzzy_lookups(metrics, resolver):
+    metrics.count("fuzzyLookups", resolver.lookups)
+    metrics.count("fuzzyCacheHits", resolver.cacheHits)
+    metrics.count("fuzzyComparisons", resolver.comparisons)
+
+
+def new_graph():
+    g = Graph()
+    g.bind("skos", SKOS)
+    g.bind("dct", DCTERMS)
+    g.bind("vann", VANN)
+    g.bind("ex", EX)
+    return g
+
+
+# ---------------------------------------------------------------------------
+# Graph rewrite rules
+# ---------------------------------------------------------------------------
+# Some source values carry rdf:XMLLiteral (or other datatypes) instead of
+# xml:lang. Since datatype and language tag are mutually exclusive in RDF,
+# the datatype is stripped and the value re-added as a plain language literal.
+TEXT_PROPS = frozenset({SKOS.example, SKOS.definition, SKOS.scopeNote, SKOS.note})
+
+# dc: and dcq: properties are migrated to dct:
+DC_TO_DCT = {
+    DC.identifier:  DCTERMS.identifier,
+    DC.creator:     DCTERMS.creator,
+    DC.title:       DCTERMS.title,
+    DC.description: DCTERMS.description,
+    DC.type:        DCTERMS.type,
+    DCQ.created:    DCTERMS.created,
+}
+
+# Nodes of these types are stripped entirely (every triple they are subject of)
+STRIPPED_TYPES = frozenset({CC.Work, CC.License})
+
+
+def retag_text_literal(s, p, o):
+    """XML or typed literal → plain literal tagged with LANG."""
+    if isinstance(o, Literal) and o.language is None:
+        return s, p, Literal(str(o), lang=LANG)
+    return None
+
+
+def migrate_dc_predicate(s, p, o):
+    """dc:/dcq: predicate → its dct: equivalent."""
+    return s, DC_TO_DCT[p], o
+
 
-    root = lxml.etree.fromstring(text.encode("utf-8"))
+# predicate → rule; a rule returns the replacement triple, or None to keep it
+TRIPLE_RULES = {
+    **{p: retag_text_literal for p in TEXT_PROPS},
+    **{p: migrate_dc_predicate for p in DC_TO_DCT},
+}
+
+# rule → metrics counter of the triples it replaced
+RULE_COUNTERS = {retag_text_literal: "retaggedLiterals", migrate_dc_predicate: "migratedPredicates"}
+
+
+class RewriteSink:
+    """
+    Parser sink that applies the rewrite rules to every triple exactly once,
+    on its way into the graph: STRIPPED_TYPES nodes are dropped, TRIPLE_RULES
+    retag literals and migrate predicates. Concepts (in document order) and
+    the set of concepts that have a skos:broader are collected on the fly,
+    so no pass over the finished graph is needed. Rewrites and stripped
+    nodes are counted in `metrics`.
+    """
+
+    def __init__(self, graph, metrics=None):
+        self.graph = graph
+        self.metrics = metrics or Metrics()
+        self.concepts = {}  # insertion-ordered set
+        self.hasBroader = set()
+        self._stripped = set()
+
+    def bind(self, prefix, namespace, override=True, replace=False):
+        self.graph.bind(prefix, namespace, override=override, replace=replace)
+
+    def add(self, triple):
+        s, p, o = triple
+        if s in self._stripped:
+            self.metrics.count("strippedTriples")
+            return
+        if p == RDF.type:
+            if o in STRIPPED_TYPES:
+                self._stripped.add(s)
+                # Anything said about the node before its type is known goes too
+                self.metrics.count("strippedNodes")
+                self.metrics.count("strippedTriples", 1 + sum(1 for _ in self.graph.predicate_objects(s)))
+                self.graph.remove((s, None, None))
+                return
+            if o == SKOS.Concept:
+                self.concepts[s] = None
+        elif p == SKOS.broader:
+            self.hasBroader.add(s)
+        else:
+            rule = TRIPLE_RULES.get(p)
+            if rule is not None:
+                rewritten = rule(s, p, o)
+                if rewritten is not None:
+                    self.metrics.count(RULE_COUNTERS[rule])
+                    triple = rewritten
+        self.graph.add(triple)
+
+
+# ---------------------------------------------------------------------------
+# DOM mode: whole document in memory, parsed by rdflib's RDF/XML parser
+# ---------------------------------------------------------------------------
+def parse_dom(rdfFile, sink, mint=mint_concept_ids):
+    """Parse an RDF/XML source into `sink`, loading the whole tree. Returns the scheme name."""
+    metrics = sink.metrics
+    with metrics.stage("parse.xml"):
+        with open(rdfFile, "r", encoding="utf-8") as f:
+            text = f.read()
+        text = text.replace(
+            f'xml:base="{LEGACY_BASE}"',
+            f'xml:base="{generalURI}"',
+        )
+
+        root = lxml.etree.fromstring(text.encode("utf-8"))
 
     # Determine scheme name from the first concept's inScheme value
     firstConcept = root.find(SKOS_CONCEPT)
     scheme = firstConcept.find(SKOS_INSCHEME).text
-    schemeURI = URIRef(generalURI + scheme)
-    print(f"Processing: {schemeURI}")
-
-    uuidPool = iter(schemeUUIDDict[scheme])
+    print(f"Processing: {generalURI + scheme}")
 
     # ------------------------------------------------------------------
     # Pass 1: Build localID → new UUID URI mapping.
@@ -143,139 +398,686 @@ for rdfFile in allRdfFiles:
     # rdf:resource references are also always "someScheme/localID" (often with
     # the wrong scheme prefix). Keying by localID alone is sufficient.
     # ------------------------------------------------------------------
-    localToNew: dict[str, str] = {}  # localID → new full UUID URI
+    with metrics.stage("parse.mint"):
+        conceptElements = [e for e in root.iter() if e.tag == SKOS_CONCEPT]
+        localIDs = [source_local_id(e.get(RDF_ABOUT)) for e in conceptElements]
+        localToNew: dict[str, str] = {}  # localID → new full UUID URI
 
-    for element in root.iter():
-        if element.tag != SKOS_CONCEPT:
-            continue
-        localID = element.get(RDF_ABOUT).split("/", 1)[-1].replace(" ", "_")
-        newUUID = next(uuidPool)
-        newURI = generalURI + scheme + "/" + newUUID
-        localToNew[localID] = newURI
-        element.set(RDF_ABOUT, newURI)
-        notationEl = lxml.etree.SubElement(
-            element, "{http://www.w3.org/2004/02/skos/core#}notation"
-        )
-        notationEl.text = newUUID
+        for element, localID, newUUID in zip(conceptElements, localIDs, mint(scheme, localIDs)):
+            localToNew[localID] = generalURI + scheme + "/" + newUUID
+            assign_concept_uri(element, scheme, newUUID)
 
-    cleanLocalIDs = list(localToNew.keys())
+        resolver = FuzzyResolver(localToNew.keys())
 
     # ------------------------------------------------------------------
     # Pass 2: Fix concept references, merge multi-value text properties,
     #         and ensure xml:lang on all literal-valued SKOS properties.
     # ------------------------------------------------------------------
-    for element in root.iter():
-        if element.tag != SKOS_CONCEPT:
+    with metrics.stage("parse.rewrite"):
+        for element in root.iter():
+            if element.tag == SKOS_CONCEPT:
+                rewrite_concept(element, localToNew, resolver, metrics)
+    count_fuzzy_lookups(metrics, resolver)
+
+    # ------------------------------------------------------------------
+    # Build RDF graph
+    # ------------------------------------------------------------------
+    with metrics.stage("parse.rdf"):
+        modifiedText = lxml.etree.tostring(root, encoding="utf-8").decode("utf-8")
+        RDFXMLParser().parse(create_input_source(data=modifiedText, format="xml"), sink)
+    return scheme
+
+
+# ---------------------------------------------------------------------------
+# Streaming mode: one top-level element at a time via lxml.etree.iterparse
+#
+# The source is read twice. The first pass only collects the concept IDs
+# (needed before any reference can be remapped or fuzzy-matched), the second
+# applies the same per-concept rewrites as the DOM mode and turns each
+# element straight into triples. Every element is cleared once handled, so
+# memory is bounded by the ID mapping and the graph, not by the document.
+# ---------------------------------------------------------------------------
+def iter_top_level(rdfFile):
+    """
+    Yield (xml:base, xml:lang, element) for every child of rdf:RDF, clearing
+    each one after the consumer is done with it. Base and language are those
+    declared on rdf:RDF.
+    """
+    depth = 0
+    base = lang = None
+    for event, element in lxml.etree.iterparse(rdfFile, events=("start", "end")):
+        if event == "start":
+            if depth == 0:
+                base = element.get(XML_BASE, "")
+                if base == LEGACY_BASE:
+                    base = generalURI
+                lang = element.get(XML_LANG)
+            depth += 1
+            continue
+        depth -= 1
+        if depth != 1:
             continue
+        yield base, lang, element
+        element.clear()
+        parent = element.getparent()
+        while element.getprevious() is not None:
+            del parent[0]
 
-        for subElement in list(element):
-            # ---- Remap concept references (narrower/broader/related) --
-            if subElement.tag in SKOS_REF_PROPS:
-                ref = subElement.get(RDF_RESOURCE, "").replace(" ", "_")
-                localID = ref.split("/", 1)[-1]
-
-                if "\ufffd" in localID or "ï¿½" in localID:
-                    distances = [distance(localID, k) for k in cleanLocalIDs]
-                    minDist = min(distances)
-                    matches = [i for i, d in enumerate(distances) if d == minDist]
-                    if len(matches) > 1:
-                        print(f"Multiple fuzzy matches for: {ref}")
-                        for i in matches:
-                            print(f"  {localToNew[cleanLocalIDs[i]]}")
-                    elif len(matches) == 1:
-                        resolved = localToNew[cleanLocalIDs[matches[0]]]
-                        print(f"Fuzzy match: {ref}  →  {resolved}")
-                        subElement.set(RDF_RESOURCE, resolved)
-                    else:
-                        print(f"No match for: {ref}")
-                elif localID in localToNew:
-                    subElement.set(RDF_RESOURCE, localToNew[localID])
-                else:
-                    print(f"Warning: no mapping found for reference: {ref}")
 
-            # ---- Remove inScheme (re-added cleanly via rdflib) --------
-            elif subElement.tag == SKOS_INSCHEME:
-                element.remove(subElement)
+# Attributes element_triples can map; anything else (rdf:ID, rdf:nodeID,
+# property attributes, a nested xml:base, ...) would change the graph
+NODE_ATTRIBUTES = {RDF_ABOUT, XML_LANG}
+PROPERTY_ATTRIBUTES = {RDF_RESOURCE, RDF_PARSE_TYPE, RDF_DATATYPE, XML_LANG}
 
-        # ---- Merge multi-value properties and tag all with xml:lang ---
-        for tag in SKOS_LANG_TAGS:
-            merge_and_tag(element, element.findall(tag))
 
-    # ------------------------------------------------------------------
-    # Build RDF graph
-    # ------------------------------------------------------------------
-    g = Graph()
-    g.bind("skos", SKOS)
-    g.bind("dct", DCTERMS)
-    g.bind("vann", VANN)
-    g.bind("ex", EX)
+def unsupported(element, message):
+    where = element.get(RDF_ABOUT, f"line {element.sourceline}")
+    return ValueError(f"{where}: {message} is not supported in streaming mode")
+
+
+def element_triples(element, base, lang=None):
+    """
+    Triples of one node element, in the order rdflib's RDF/XML parser would
+    produce them. Covers the constructs used by the legacy exports: typed
+    node elements with rdf:about, and property elements carrying
+    rdf:resource, rdf:parseType="Literal", rdf:datatype or plain text. Any
+    other construct raises ValueError rather than yielding a different graph
+    than the DOM mode would; `lang` is the xml:lang inherited from rdf:RDF.
+    """
+    extra = set(element.attrib) - NODE_ATTRIBUTES
+    if extra:
+        raise unsupported(element, f"attribute {sorted(extra)[0]} on <{element.tag}>")
+    if element.get(RDF_ABOUT) is None:
+        raise unsupported(element, f"<{element.tag}> without rdf:about")
+    subject = URIRef(urljoin(base, element.get(RDF_ABOUT)))
+    if element.tag != RDF_DESCRIPTION:
+        yield subject, RDF.type, URIRef(element.tag[1:].replace("}", "", 1))
+    inheritedLang = element.get(XML_LANG, lang)
+
+    for prop in element:
+        if not isinstance(prop.tag, str):  # comments, processing instructions
+            continue
+        extra = set(prop.attrib) - PROPERTY_ATTRIBUTES
+        if extra:
+            raise unsupported(element, f"attribute {sorted(extra)[0]} on <{prop.tag}>")
+        if prop.tag == RDF_LI:
+            raise unsupported(element, "rdf:li")
+        predicate = URIRef(prop.tag[1:].replace("}", "", 1))
+        resource = prop.get(RDF_RESOURCE)
+        if resource is not None:
+            yield subject, predicate, URIRef(urljoin(base, resource))
+            continue
+        if len(prop):
+            raise unsupported(element, f"nested element in <{prop.tag}>")
+        parseType = prop.get(RDF_PARSE_TYPE)
+        text = prop.text or ""
+        if parseType == "Literal":
+            yield subject, predicate, Literal(escape(text), datatype=RDF.XMLLiteral)
+        elif parseType is not None:
+            raise unsupported(element, f'rdf:parseType="{parseType}" on <{prop.tag}>')
+        elif prop.get(RDF_DATATYPE) is not None:
+            yield subject, predicate, Literal(text, datatype=URIRef(urljoin(base, prop.get(RDF_DATATYPE))))
+        else:
+            yield subject, predicate, Literal(text, lang=prop.get(XML_LANG, inheritedLang))
+
+
+def parse_streaming(rdfFile, sink, mint=mint_concept_ids):
+    """Parse an RDF/XML source into `sink` without loading the whole tree. Returns the scheme name."""
+    metrics = sink.metrics
+    # ---- Pass 1: concept IDs in document order -----------------------
+    scheme = None
+    localIDs = []
+    with metrics.stage("parse.xml"):
+        for _, _, element in iter_top_level(rdfFile):
+            if element.tag != SKOS_CONCEPT:
+                continue
+            if scheme is None:
+                scheme = element.find(SKOS_INSCHEME).text
+                print(f"Processing: {generalURI + scheme}")
+            localIDs.append(source_local_id(element.get(RDF_ABOUT)))
 
-    modifiedText = lxml.etree.tostring(root, encoding="utf-8").decode("utf-8")
-    g.parse(data=modifiedText, format="xml")
-
-    # ---- Rewrite typed literals on text properties as lang-tagged ----
-    # Some source values carry rdf:XMLLiteral (or other datatypes) instead of
-    # xml:lang. Since datatype and language tag are mutually exclusive in RDF,
-    # we strip the datatype and re-add the value as a plain language literal.
-    TEXT_PROPS = {SKOS.example, SKOS.definition, SKOS.scopeNote, SKOS.note}
-    for prop in TEXT_PROPS:
-        for s, _, o in list(g.triples((None, prop, None))):
-            if isinstance(o, Literal) and o.language is None:
-                g.remove((s, prop, o))
-                g.add((s, prop, Literal(str(o), lang=LANG)))
-
-    # ---- Strip cc:Work / cc:License nodes entirely --------------------
-    for s, p, o in list(g.triples((None, RDF.type, CC.Work))):
-        for triple in list(g.triples((s, None, None))):
-            g.remove(triple)
-    for s, p, o in list(g.triples((None, RDF.type, CC.License))):
-        for triple in list(g.triples((s, None, None))):
-            g.remove(triple)
-
-    # ---- Migrate dc: and dcq: properties to dct: ---------------------
-    DC_TO_DCT = {
-        DC.identifier:  DCTERMS.identifier,
-        DC.creator:     DCTERMS.creator,
-        DC.title:       DCTERMS.title,
-        DC.description: DCTERMS.description,
-        DC.type:        DCTERMS.type,
-        DCQ.created:    DCTERMS.created,
+    with metrics.stage("parse.mint"):
+        conceptUUIDs = mint(scheme, localIDs)  # new UUID of the n-th concept
+        localToNew: dict[str, str] = {         # localID → new full UUID URI
+            localID: generalURI + scheme + "/" + newUUID
+            for localID, newUUID in zip(localIDs, conceptUUIDs)
+        }
+
+        resolver = FuzzyResolver(localToNew.keys())
+
+    # ---- Pass 2: rewrite each element and emit its triples -----------
+    # XML parsing, rewrites and triple construction interleave here, so
+    # they are timed together as one stage
+    conceptIndex = 0
+    with metrics.stage("parse.rewrite"):
+        for base, lang, element in iter_top_level(rdfFile):
+            if element.tag == SKOS_CONCEPT:
+                assign_concept_uri(element, scheme, conceptUUIDs[conceptIndex])
+                conceptIndex += 1
+                rewrite_concept(element, localToNew, resolver, metrics)
+            for triple in element_triples(element, base, lang):
+                sink.add(triple)
+    count_fuzzy_lookups(metrics, resolver)
+    return scheme
+
+
+# ---------------------------------------------------------------------------
+# Conversion of a single scheme
+# ---------------------------------------------------------------------------
+def peek_scheme(rdfFile):
+    """Scheme name from the first concept's inScheme, without parsing the rest of the file."""
+    for _, _, element in iter_top_level(rdfFile):
+        if element.tag == SKOS_CONCEPT:
+            return element.find(SKOS_INSCHEME).text
+    raise ValueError(f"{rdfFile}: no skos:Concept found")
+
+
+def output_path(scheme, format="turtle"):
+    return os.path.join(OUTPUT_DIR, f"{scheme}_modified{FORMATS[format]}")
+
+
+def scheme_config(scheme, writer="rdflib", format="turtle", closeRelations=False):
+    """Everything besides the source file that shapes a scheme's output."""
+    return {
+        "closeRelations": closeRelations,
+        "scheme": scheme,
+        "generalURI": generalURI,
+        "lang": LANG,
+        "metadata": descriptionDict[scheme],
+        "writer": writer,
+        "format": format,
     }
-    for old_p, new_p in DC_TO_DCT.items():
-        for s, _, o in list(g.triples((None, old_p, None))):
-            g.remove((s, old_p, o))
-            g.add((s, new_p, o))
-
-    # ---- ConceptScheme metadata ---------------------------------------
-    g.add((schemeURI, RDF.type, SKOS.ConceptScheme))
-    g.add((schemeURI, DCTERMS.title,       Literal(descriptionDict[scheme]["title"],       lang=LANG)))
-    g.add((schemeURI, DCTERMS.description, Literal(descriptionDict[scheme]["description"], lang=LANG)))
-    g.add((schemeURI, DCTERMS.license,     CC_LICENSE))
-    g.add((schemeURI, VANN.preferredNamespaceUri, Literal(schemeURI)))
-
-    author = descriptionDict[scheme]["author"]
-    if isinstance(author, list):
-        for a in author:
-            g.add((schemeURI, DCTERMS.creator, Literal(a)))
-    else:
-        g.add((schemeURI, DCTERMS.creator, Literal(author)))
 
-    # ---- inScheme, topConcepts, license per concept ------------------
-    topConcepts = []
-    for s, _, __ in g.triples((None, RDF.type, SKOS.Concept)):
-        g.add((s, SKOS.inScheme, schemeURI))
-        g.add((s, DCTERMS.license, CC_LICENSE))
-        if not (s, SKOS.broader, None) in g:
-            topConcepts.append(s)
 
-    for topConcept in topConcepts:
-        g.add((schemeURI, SKOS.hasTopConcept, topConcept))
+# ---------------------------------------------------------------------------
+# Relation closure
+#
+# gatsby-node.js adds the inverse of every narrower/broader/related/
+# hasTopConcept/topConceptOf triple on each site build. With --close-relations
+# the converter writes them out instead and marks the scheme with
+# ex:closedRelations true, which tells the JS build to skip that pass.
+# ---------------------------------------------------------------------------
+INVERSE_RELATIONS = {
+    SKOS.broader:       SKOS.narrower,
+    SKOS.narrower:      SKOS.broader,
+    SKOS.related:       SKOS.related,
+    SKOS.hasTopConcept: SKOS.topConceptOf,
+    SKOS.topConceptOf:  SKOS.hasTopConcept,
+}
+
+
+def close_relations(g, schemeURI):
+    """Add the missing inverse of every SKOS relation in INVERSE_RELATIONS. Returns the number added."""
+    missing = set()
+    for p, inverse in INVERSE_RELATIONS.items():
+        for s, o in g.subject_objects(p):
+            if isinstance(o, URIRef) and (o, inverse, s) not in g:
+                missing.add((o, inverse, s))
+    for triple in missing:
+        g.add(triple)
+    g.add((schemeURI, EX.closedRelations, Literal(True)))
+    return len(missing)
+
+
+def build_scheme_graph(rdfFile, streaming=False, ledger=LEDGER_FILE, closeRelations=False, metrics=None):
+    """Parse, rewrite and complete one scheme. Returns (scheme, graph, concept count)."""
+    metrics = metrics or Metrics()
+    g = new_graph()
+    sink = RewriteSink(g, metrics)
+    mint = partial(mint_concept_ids, ledgerPath=ledger)
+    scheme = (parse_streaming if streaming else parse_dom)(rdfFile, sink, mint)
+    schemeURI = URIRef(generalURI + scheme)
+    concepts, hasBroader = sink.concepts, sink.hasBroader
+
+    with metrics.stage("complete"):
+        # ---- ConceptScheme metadata -----------------------------------
+        g.add((schemeURI, RDF.type, SKOS.ConceptScheme))
+        g.add((schemeURI, DCTERMS.title,       Literal(descriptionDict[scheme]["title"],       lang=LANG)))
+        g.add((schemeURI, DCTERMS.description, Literal(descriptionDict[scheme]["description"], lang=LANG)))
+        g.add((schemeURI, DCTERMS.license,     CC_LICENSE))
+        g.add((schemeURI, VANN.preferredNamespaceUri, Literal(schemeURI)))
+
+        author = descriptionDict[scheme]["author"]
+        if isinstance(author, list):
+            for a in author:
+                g.add((schemeURI, DCTERMS.creator, Literal(a)))
+        else:
+            g.add((schemeURI, DCTERMS.creator, Literal(author)))
+
+        # ---- inScheme, topConcepts, license per concept --------------
+        topConcepts = [s for s in concepts if s not in hasBroader]
+        for s in concepts:
+            g.add((s, SKOS.inScheme, schemeURI))
+            g.add((s, DCTERMS.license, CC_LICENSE))
+
+        for topConcept in topConcepts:
+            g.add((schemeURI, SKOS.hasTopConcept, topConcept))
+
+        # ---- Concept count -------------------------------------------
+        g.add((schemeURI, EX.conceptCount, Literal(str(len(concepts)))))
 
-    # ---- Concept count -----------------------------------------------
-    conceptCount = str(sum(1 for _ in g.triples((None, RDF.type, SKOS.Concept))))
-    g.add((schemeURI, EX.conceptCount, Literal(conceptCount)))
+        if closeRelations:
+            metrics.count("closedRelations", close_relations(g, schemeURI))
+
+    metrics.count("concepts", len(concepts))
+    metrics.count("triples", len(g))
+    return scheme, g, len(concepts)
+
+
+def scheme_summary(
+    rdfFile, scheme, output, concepts, startTime, metrics,
+    skipped=False, written=False, manifestEntry=None, validation=None, changes=None,
+):
+    """The summary dict convert_scheme returns, built in one place so every path has the same keys."""
+    return {
+        "source": rdfFile,
+        "scheme": scheme,
+        "output": output,
+        "concepts": concepts,
+        "seconds": time.perf_counter() - startTime,
+        "skipped": skipped,
+        "written": written,
+        "manifestEntry": manifestEntry,
+        "validation": validation,
+        "changes": changes,
+        "metrics": metrics.as_dict(),
+    }
+
+
+def convert_scheme(
+    rdfFile, streaming=False, ledger=LEDGER_FILE, manifest=MANIFEST_FILE, force=False, snapshot=True,
+    writer="rdflib", format="turtle", validate=False, failFast=False, closeRelations=False,
+    hierarchyIndex=False, labelIndex=False, diff=False,
+):
+    """
+    Convert one legacy RDF/XML source into ttl/<scheme>_modified.ttl (.nt for
+    N-Triples).
+
+    `writer` is "rdflib" (g.serialize) or "stream" (rdfWriter: subject blocks
+    in notation order, streamed to the file). `closeRelations` materialises
+    the inverse SKOS relations (see close_relations). `hierarchyIndex` writes
+    the ttl/<scheme>_hierarchy.json sidecar next to the output. With `diff`,
+    the new graph is compared with the previous output and, if they differ,
+    ttl/<scheme>_changes.json and .rdfp describe the change (see graphDiff).
+
+    Sources whose content, configuration and converter version match the
+    build manifest are skipped unless `force` is set. The output is only
+    rewritten when its bytes change. With `snapshot`, the binary graph
+    snapshot next to the output is (re)written whenever it is not current.
+
+    With `validate`, the graph is checked against the SHACL shapes before it
+    is written; a scheme with Violations is reported as invalid and its
+    previous output is left in place.
+
+    Returns a summary dict with the scheme name, output path, concept count,
+    wall-clock seconds, whether the scheme was skipped or written, and the
+    manifest entry to record for it (None for invalid schemes), plus the
+    validation report when validating, the change counts with `diff` and
+    the stage timings and counters (see pipelineMetrics).
+    """
+    startTime = time.perf_counter()
+    metrics = Metrics()
+    with metrics.stage("manifest"):
+        sourceHash = file_digest(rdfFile)
+        scheme = peek_scheme(rdfFile)
+        configHash = config_digest(scheme_config(scheme, writer, format, closeRelations))
+
+        entry = None if force else BuildManifest(manifest).is_current(
+            rdfFile, sourceHash, configHash, CONVERTER_VERSION
+        )
+    if entry is not None:
+        if snapshot and not snapshot_is_current(entry["output"], entry["outputHash"]):
+            with metrics.stage("snapshot"):
+                load_view(entry["output"]).close()
+        if hierarchyIndex and load_current_hierarchy_index(entry["output"], entry["outputHash"]) is None:
+            with metrics.stage("hierarchyIndex"):
+                write_hierarchy_index(
+                    entry["output"],
+                    build_hierarchy_index(load_graph(entry["output"]), URIRef(generalURI + scheme)),
+                    entry["outputHash"],
+                )
+        if labelIndex and load_current_label_index(entry["output"], LANG, entry["outputHash"]) is None:
+            with metrics.stage("labelIndex"):
+                write_label_index(
+                    entry["output"],
+                    build_label_index(load_graph(entry["output"]), URIRef(generalURI + scheme)),
+                    entry["outputHash"],
+                )
+        validation = None
+        if validate:
+            with metrics.stage("validate"):
+                validation = validate_graph(load_graph(entry["output"]), failFast=failFast)
+        return scheme_summary(
+            rdfFile, scheme, entry["output"], entry["concepts"], startTime, metrics,
+            skipped=True, manifestEntry=entry, validation=validation,
+        )
+
+    scheme, g, conceptCount = build_scheme_graph(
+        rdfFile, streaming=streaming, ledger=ledger, closeRelations=closeRelations, metrics=metrics
+    )
+
+    # ---- Validate -----------------------------------------------------
+    validation = None
+    if validate:
+        with metrics.stage("validate"):
+            validation = validate_graph(g, failFast=failFast)
+    if validation is not None and validation["violations"]:
+        return scheme_summary(
+            rdfFile, scheme, output_path(scheme, format), conceptCount, startTime, metrics, validation=validation
+        )
+
+    # ---- Diff against the previous output -----------------------------
+    outPath = output_path(scheme, format)
+    changes = previousHash = None
+    if diff:
+        with metrics.stage("diff"):
+            if os.path.exists(outPath):
+                with load_view(outPath) as previous:
+                    changes = diff_graphs(previous, g)
+                    previousHash = previous.ttlHash
+            else:
+                changes = diff_graphs(None, g)
 
     # ---- Serialize ----------------------------------------------------
-    outPath = f"ttl/{scheme}_modified.ttl"
-    g.serialize(outPath, format="turtle", encoding="utf-8")
-    print(f"  → {outPath}  ({conceptCount} concepts)")
\ No newline at end of file
+    with metrics.stage("serialize"):
+        if writer == "stream":
+            with AtomicOutput(outPath) as out:
+                write_graph(g, out, format)
+            written, outputHash = out.written, out.hexdigest
+        else:
+            data = g.serialize(format=format, encoding="utf-8")
+            written = write_if_changed(outPath, data)
+            outputHash = hashlib.sha256(data).hexdigest()
+    if snapshot and (written or not snapshot_is_current(outPath, outputHash)):
+        with metrics.stage("snapshot"):
+            write_snapshot(g, outPath, outputHash)
+    if hierarchyIndex:
+        with metrics.stage("hierarchyIndex"):
+            write_hierarchy_index(outPath, build_hierarchy_index(g, URIRef(generalURI + scheme)), outputHash)
+    if labelIndex:
+        with metrics.stage("labelIndex"):
+            write_label_index(outPath, build_label_index(g, URIRef(generalURI + scheme)), outputHash)
+    if changes is not None and not is_empty(changes):
+        with metrics.stage("changeset"):
+            write_changeset(outPath, changes, URIRef(generalURI + scheme), previousHash, outputHash)
+
+    manifestEntry = {
+        "scheme": scheme,
+        "sourceHash": sourceHash,
+        "configHash": configHash,
+        "converterVersion": CONVERTER_VERSION,
+        "output": outPath,
+        "outputHash": outputHash,
+        "concepts": conceptCount,
+    }
+    return scheme_summary(
+        rdfFile, scheme, outPath, conceptCount, startTime, metrics,
+        written=written, manifestEntry=manifestEntry, validation=validation,
+        changes=change_counts(changes) if changes is not None else None,
+    )
+
+
+def profile_path(profileDir, rdfFile):
+    return os.path.join(profileDir, os.path.splitext(os.path.basename(rdfFile))[0] + ".pstats")
+
+
+def _convert_worker(rdfFile, options, profileDir=None):
+    """
+    Process-pool entry point: never raises, so a failing scheme cannot take
+    the pool down. Returns (summary, None) or (None, formatted traceback).
+    With `profileDir`, the conversion runs under cProfile and its stats are
+    dumped to <profileDir>/<source name>.pstats.
+    """
+    profiler = cProfile.Profile() if profileDir else None
+    try:
+        if profiler is not None:
+            profiler.enable()
+        return convert_scheme(rdfFile, **options), None
+    except Exception:
+        return None, traceback.format_exc()
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(profile_path(profileDir, rdfFile))
+
+
+def write_metrics(path, schemes, totals):
+    """Write the per-scheme stage timings and counters as one JSON document."""
+    document = {
+        "converterVersion": CONVERTER_VERSION,
+        "total": totals,
+        "schemes": dict(sorted(schemes.items())),
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=4, ensure_ascii=False)
+        f.write("\n")
+
+
+def print_profile(profileDir, rdfFiles, limit=25):
+    """Merge the per-scheme profiles into <profileDir>/all.pstats and print the top entries."""
+    paths = [profile_path(profileDir, f) for f in rdfFiles if os.path.exists(profile_path(profileDir, f))]
+    if not paths:
+        return
+    stats = pstats.Stats(*paths, stream=sys.stdout)
+    stats.dump_stats(os.path.join(profileDir, "all.pstats"))
+    stats.sort_stats("cumulative").print_stats(limit)
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+def find_sources(pattern=RDF_SOURCE_GLOB):
+    return sorted(x for x in glob.glob(pattern) if "modified" not in x)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Convert legacy museumvok RDF/XML schemes to SKOS Turtle (ttl/<scheme>_modified.ttl)."
+    )
+    parser.add_argument(
+        "sources", nargs="*",
+        help=f"RDF/XML files to convert (default: all of {RDF_SOURCE_GLOB})",
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1,
+        help="number of worker processes; schemes are converted in parallel when > 1, "
+             "0 uses one process per CPU (default: 1)",
+    )
+    parser.add_argument(
+        "--ledger", default=LEDGER_FILE,
+        help=f"localID → ID ledger that keeps concept URIs stable across runs (default: {LEDGER_FILE})",
+    )
+    parser.add_argument(
+        "--manifest", default=MANIFEST_FILE,
+        help=f"build manifest used to skip unchanged schemes (default: {MANIFEST_FILE})",
+    )
+    parser.add_argument(
+        "--force", action="store_true",
+        help="convert every source even if the manifest says its output is current",
+    )
+    parser.add_argument(
+        "--no-snapshot", dest="snapshot", action="store_false",
+        help="do not write the binary graph snapshot next to each output",
+    )
+    parser.add_argument(
+        "--writer", choices=("rdflib", "stream"), default="rdflib",
+        help="rdflib's serializer, or the streaming writer that orders subject blocks by "
+             "notation for stable diffs (default: rdflib)",
+    )
+    parser.add_argument(
+        "--format", choices=sorted(FORMATS), default="turtle",
+        help="output format; nt writes ttl/<scheme>_modified.nt (default: turtle)",
+    )
+    parser.add_argument(
+        "--close-relations", action="store_true",
+        help="write the inverse of every broader/narrower/related/hasTopConcept/topConceptOf "
+             "relation and mark the scheme ex:closedRelations true, so the site build can "
+             "skip its own inverse pass",
+    )
+    parser.add_argument(
+        "--hierarchy-index", action="store_true",
+        help="also write ttl/<scheme>_hierarchy.json with depth, breadcrumb path and descendant "
+             "count per concept, polyhierarchy and cycles",
+    )
+    parser.add_argument(
+        "--label-index", action="store_true",
+        help="also write ttl/<scheme>_labels.<lang>.json: normalised pref/alt/hidden labels "
+             "with exact and prefix lookup tables, one shard per language",
+    )
+    parser.add_argument(
+        "--diff", action="store_true",
+        help="compare each new graph with the previous output and write the changed concepts "
+             "per predicate to ttl/<scheme>_changes.json and an RDF Patch to ttl/<scheme>_changes.rdfp",
+    )
+    parser.add_argument(
+        "--dataset", metavar="PATH",
+        help=f"also merge all converted schemes into one dataset of named graphs "
+             f"({' or '.join(DATASET_FORMATS)}, by extension) with a shared term dictionary",
+    )
+    parser.add_argument(
+        "--validate", action="store_true",
+        help=f"check each graph against {SHAPES_FILE} before writing it; schemes with "
+             "Violations are not written and make the run fail",
+    )
+    parser.add_argument(
+        "--fail-fast", action="store_true",
+        help="with --validate: stop at the first Violation and cancel remaining schemes",
+    )
+    parser.add_argument(
+        "--validation-report", default=REPORT_FILE,
+        help=f"machine-readable JSON validation report (default: {REPORT_FILE})",
+    )
+    parser.add_argument(
+        "--metrics", default=METRICS_FILE,
+        help=f"JSON summary of wall/CPU time and peak RSS per stage and scheme, and of the "
+             f"rewrite counters (default: {METRICS_FILE})",
+    )
+    parser.add_argument(
+        "--profile", metavar="DIR",
+        help="run each conversion under cProfile, write DIR/<source>.pstats and DIR/all.pstats "
+             "and print the most expensive functions",
+    )
+    parser.add_argument(
+        "--streaming", action="store_true",
+        help="read sources incrementally with lxml iterparse instead of loading the whole "
+             "document (bounded memory for very large exports)",
+    )
+    args = parser.parse_args(argv)
+    if args.dataset:
+        try:
+            dataset_format(args.dataset)
+        except ValueError as e:
+            parser.error(str(e))
+    jobs = args.jobs or os.cpu_count() or 1
+    validate = args.validate or args.fail_fast
+
+    sources = args.sources or find_sources()
+    options = {
+        "streaming": args.streaming,
+        "ledger": args.ledger,
+        "manifest": args.manifest,
+        "force": args.force,
+        "snapshot": args.snapshot,
+        "writer": args.writer,
+        "format": args.format,
+        "validate": validate,
+        "failFast": args.fail_fast,
+        "closeRelations": args.close_relations,
+        "hierarchyIndex": args.hierarchy_index,
+        "labelIndex": args.label_index,
+        "diff": args.diff,
+    }
+    failures = []
+    converted = skipped = 0
+    manifest = BuildManifest(args.manifest)
+    validationReports = {}
+    schemeMetrics = {}
+    outputs = []
+    if args.profile:
+        os.makedirs(args.profile, exist_ok=True)
+
+    def report(rdfFile, summary, error):
+        nonlocal converted, skipped
+        if error is not None:
+            failures.append(rdfFile)
+            print(f"FAILED: {rdfFile}\n{error}", file=sys.stderr)
+            return
+        schemeMetrics[summary["scheme"]] = {
+            "source": rdfFile,
+            "skipped": summary["skipped"],
+            "concepts": summary["concepts"],
+            "seconds": round(summary["seconds"], 4),
+            **summary["metrics"],
+        }
+        validation = summary["validation"]
+        if validation is not None:
+            validationReports[summary["scheme"]] = validation
+            if validation["violations"]:
+                failures.append(rdfFile)
+                print(
+                    f"INVALID: {rdfFile} ({validation['violations']} violations, "
+                    f"{validation['warnings']} warnings; see {args.validation_report})",
+                    file=sys.stderr,
+                )
+                for result in validation["results"][:5]:
+                    print(format_result(result), file=sys.stderr)
+                return
+        manifest.record(rdfFile, summary["manifestEntry"])
+        outputs.append(summary["output"])
+        if summary["skipped"]:
+            skipped += 1
+            print(f"  = {summary['output']}  (unchanged source, skipped)")
+        else:
+            converted += 1
+            changes = f"; {format_counts(summary['changes'])}" if summary["changes"] and any(summary["changes"].values()) else ""
+            print(
+                f"  → {summary['output']}  ({summary['concepts']} concepts, "
+                f"{summary['seconds']:.2f} s{'' if summary['written'] else ', output unchanged'}{changes})"
+            )
+
+    totalStart = time.perf_counter()
+    if jobs > 1 and len(sources) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(sources))) as pool:
+            futures = {
+                pool.submit(_convert_worker, rdfFile, options, args.profile): rdfFile for rdfFile in sources
+            }
+            for future in as_completed(futures):
+                try:
+                    summary, error = future.result()
+                except Exception:
+                    # The worker process itself died (e.g. killed by the OOM killer)
+                    summary, error = None, traceback.format_exc()
+                report(futures[future], summary, error)
+                if failures and args.fail_fast:
+                    for pending in futures:
+                        pending.cancel()
+                    break
+    else:
+        for rdfFile in sources:
+            report(rdfFile, *_convert_worker(rdfFile, options, args.profile))
+            if failures and args.fail_fast:
+                break
+
+    totalSeconds = time.perf_counter() - totalStart
+    manifest.save()
+    if validate:
+        write_report(args.validation_report, validationReports)
+    write_metrics(args.metrics, schemeMetrics, run_totals(totalSeconds, schemeMetrics.values()))
+    if args.dataset and outputs:
+        dataset, written = build_dataset_file(outputs, args.dataset)
+        stats = dataset.stats()
+        print(
+            f"  ⇒ {args.dataset}  ({stats['graphs']} graphs, {stats['quads']} quads, "
+            f"{stats['terms']} distinct terms{'' if written else ', output unchanged'})"
+        )
+    if args.profile:
+        print_profile(args.profile, sources)
+    print(
+        f"Converted {converted}/{len(sources)} schemes ({skipped} up to date, {len(failures)} failed) "
+        f"in {totalSeconds:.2f} s"
+    )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
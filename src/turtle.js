@@ -0,0 +1,53 @@
+const n3 = require("n3")
+const { DataFactory } = n3
+const { namedNode } = DataFactory
+
+const inverses = {
+  "http://www.w3.org/2004/02/skos/core#narrower":
+    "http://www.w3.org/2004/02/skos/core#broader",
+  "http://www.w3.org/2004/02/skos/core#broader":
+    "http://www.w3.org/2004/02/skos/core#narrower",
+  "http://www.w3.org/2004/02/skos/core#related":
+    "http://www.w3.org/2004/02/skos/core#related",
+  "http://www.w3.org/2004/02/skos/core#hasTopConcept":
+    "http://www.w3.org/2004/02/skos/core#topConceptOf",
+  "http://www.w3.org/2004/02/skos/core#topConceptOf":
+    "http://www.w3.org/2004/02/skos/core#hasTopConcept",
+}
+
+// Set by the converter (--close-relations) on schemes whose Turtle already
+// contains every inverse relation
+const closedRelations = "http://www.example.org/closedRelations"
+
+/**
+ * Parses a Turtle string and adds the inverse of every SKOS relation, unless
+ * the file is marked with ex:closedRelations true.
+ * @param {string} ttlString
+ * @returns {Array} quads
+ */
+const parseTurtle = (ttlString) => {
+  const quads = new n3.Parser().parse(ttlString)
+  const store = new n3.Store()
+  store.addQuads(quads)
+  const closed = quads.some(
+    (quad) =>
+      quad.predicate.id === closedRelations && quad.object.value === "true"
+  )
+  !closed &&
+    quads.forEach((quad) => {
+      inverses[quad.predicate.id] &&
+        store.addQuad(
+          quad.object,
+          namedNode(inverses[quad.predicate.id]),
+          quad.subject,
+          quad.graph
+        )
+    })
+  return store.getQuads()
+}
+
+module.exports = {
+  inverses,
+  closedRelations,
+  parseTurtle,
+}
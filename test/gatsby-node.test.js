@@ -1,4 +1,5 @@
 import { parseLanguages } from "../src/common"
+import { parseTurtle } from "../src/turtle"
 import { compactedHashURI, compactedSlashURI } from "./data/gatsby-node-data"
 
 describe("gatsby node", () => {
@@ -11,3 +12,56 @@ describe("gatsby node", () => {
     expect(languages.size).toBe(2)
   })
 })
+
+describe("parseTurtle", () => {
+  const prefixes = `
+    @prefix ex: <http://www.example.org/> .
+    @prefix skos: <http://www.w3.org/2004/02/skos/core#> .
+  `
+  const skos = "http://www.w3.org/2004/02/skos/core#"
+  const ex = "http://www.example.org/"
+  const has = (quads, s, p, o) =>
+    quads.some(
+      (q) =>
+        q.subject.value === s &&
+        q.predicate.value === skos + p &&
+        q.object.value === o
+    )
+
+  it("adds the inverse relations to an unmarked file", () => {
+    const quads = parseTurtle(`${prefixes}
+      ex:scheme a skos:ConceptScheme ; skos:hasTopConcept ex:a .
+      ex:b skos:broader ex:a ; skos:related ex:c .
+    `)
+    expect(has(quads, ex + "a", "topConceptOf", ex + "scheme")).toBe(true)
+    expect(has(quads, ex + "a", "narrower", ex + "b")).toBe(true)
+    expect(has(quads, ex + "c", "related", ex + "b")).toBe(true)
+    expect(quads).toHaveLength(7)
+  })
+
+  it("keeps a file marked ex:closedRelations true unchanged", () => {
+    const ttl = `${prefixes}
+      ex:scheme a skos:ConceptScheme ; ex:closedRelations true ;
+        skos:hasTopConcept ex:a .
+      ex:a skos:topConceptOf ex:scheme ; skos:narrower ex:b .
+      ex:b skos:broader ex:a .
+    `
+    const quads = parseTurtle(ttl)
+    expect(quads).toHaveLength(6)
+    expect(
+      quads.filter((q) => q.predicate.value === skos + "narrower")
+    ).toHaveLength(1)
+    expect(
+      quads.filter((q) => q.predicate.value === skos + "topConceptOf")
+    ).toHaveLength(1)
+  })
+
+  it("does not add missing inverses to a marked file", () => {
+    const quads = parseTurtle(`${prefixes}
+      ex:scheme ex:closedRelations true .
+      ex:b skos:broader ex:a .
+    `)
+    expect(quads).toHaveLength(2)
+    expect(has(quads, ex + "a", "narrower", ex + "b")).toBe(false)
+  })
+})